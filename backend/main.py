@@ -43,7 +43,7 @@ from backend.routes import webhooks
 from backend.config import settings
 from backend.services.github_service import process_push_event
 from backend.slack_monitor import slack_monitor, start_monitor
-from backend.processTools.rag import query_rag
+from backend.processTools.rag import query_rag_multi
 from backend.processTools.gemini_rag import query_rag as gemini_query_rag
 
 app = FastAPI()
@@ -467,8 +467,8 @@ async def chat_endpoint_post(chat_query: ChatQuery):
         # Capture debug information
         debug_info = {}
         
-        # Call the RAG system with the query
-        answer, node_type, reason = query_rag(query, top_k=500, capture_debug=debug_info)
+        # Call the RAG system with the query; ambiguous queries search several indexes at once
+        answer, node_type, reason = await query_rag_multi(query, top_k=500, capture_debug=debug_info)
         
         return {
             "status": "success",
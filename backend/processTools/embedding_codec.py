@@ -0,0 +1,124 @@
+"""
+Compact encoding of node embeddings for the JSON intermediate files.
+
+Embeddings are stored as base64-packed float16 instead of JSON float lists,
+which cuts the size of mock_with_embeddings.json by roughly 4x. Optionally
+they can be quantized further to int8 with a per-vector scale (another 2x).
+The Neo4j vector index still needs a list of floats, so nodes are decoded
+right before they are written to the database.
+"""
+
+import base64
+import numpy as np
+from typing import Dict, Any, List, Tuple
+
+# Node property holding the base64-packed float16 embedding
+PACKED_EMBEDDING_FIELD = "embedding_f16"
+
+# Node properties holding the base64-packed int8 embedding and its scale
+QUANTIZED_EMBEDDING_FIELD = "embedding_i8"
+EMBEDDING_SCALE_FIELD = "embedding_scale"
+
+# Node property holding the embedding as a list of floats (what Neo4j indexes)
+EMBEDDING_FIELD = "embedding"
+
+# Supported storage formats for packed embeddings
+STORAGE_FLOAT16 = "float16"
+STORAGE_INT8 = "int8"
+
+# Node property holding the primary packed field for each storage format
+STORAGE_FIELDS = {
+    STORAGE_FLOAT16: PACKED_EMBEDDING_FIELD,
+    STORAGE_INT8: QUANTIZED_EMBEDDING_FIELD
+}
+
+def encode_embedding(vector: np.ndarray) -> str:
+    """Pack an embedding vector into a base64 float16 string"""
+    return base64.b64encode(np.asarray(vector, dtype=np.float16).tobytes()).decode("ascii")
+
+def encode_embeddings(vectors: np.ndarray) -> List[str]:
+    """Pack a (n, dimension) matrix of embeddings into base64 float16 strings, one per row"""
+    packed = np.ascontiguousarray(vectors, dtype=np.float16)
+    return [base64.b64encode(row.tobytes()).decode("ascii") for row in packed]
+
+def quantize_embeddings(vectors: np.ndarray) -> Tuple[List[str], List[float]]:
+    """
+    Quantize a (n, dimension) matrix of embeddings to int8, one scale per row.
+
+    Each row is divided by its largest absolute value and mapped onto
+    [-127, 127]. Returns the base64 int8 strings and the scales needed to
+    restore them.
+    """
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(matrix).max(axis=1)
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.rint(matrix / scales[:, None] * 127), -127, 127).astype(np.int8)
+    return [base64.b64encode(row.tobytes()).decode("ascii") for row in quantized], scales.tolist()
+
+def dequantize_embedding(packed: str, scale: float) -> np.ndarray:
+    """Unpack a base64 int8 string and its scale into a float32 vector"""
+    return np.frombuffer(base64.b64decode(packed), dtype=np.int8).astype(np.float32) * (scale / 127)
+
+def pack_node_embeddings(nodes: List[Dict[str, Any]], vectors: np.ndarray, storage: str = STORAGE_FLOAT16):
+    """Store one row of `vectors` on each node (in place) in the given storage format"""
+    if storage == STORAGE_INT8:
+        packed, scales = quantize_embeddings(vectors)
+        for node, value, scale in zip(nodes, packed, scales):
+            node[QUANTIZED_EMBEDDING_FIELD] = value
+            node[EMBEDDING_SCALE_FIELD] = scale
+    else:
+        for node, value in zip(nodes, encode_embeddings(vectors)):
+            node[PACKED_EMBEDDING_FIELD] = value
+
+def decode_embedding(packed: str) -> np.ndarray:
+    """Unpack a base64 float16 string into a float32 vector"""
+    return np.frombuffer(base64.b64decode(packed), dtype=np.float16).astype(np.float32)
+
+def unpack_node_embedding(node: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the node with its packed embedding expanded to a list of floats.
+
+    Nodes without a packed embedding (including older files that still store
+    float lists) are returned unchanged.
+    """
+    quantized = node.get(QUANTIZED_EMBEDDING_FIELD)
+    if quantized is not None:
+        unpacked = {key: value for key, value in node.items()
+                    if key not in (QUANTIZED_EMBEDDING_FIELD, EMBEDDING_SCALE_FIELD)}
+        unpacked[EMBEDDING_FIELD] = dequantize_embedding(quantized, node.get(EMBEDDING_SCALE_FIELD, 1.0)).tolist()
+        return unpacked
+
+    packed = node.get(PACKED_EMBEDDING_FIELD)
+    if packed is None:
+        return node
+
+    unpacked = {key: value for key, value in node.items() if key != PACKED_EMBEDDING_FIELD}
+    unpacked[EMBEDDING_FIELD] = decode_embedding(packed).tolist()
+    return unpacked
+
+def unpack_node_embeddings(nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Expand the packed embeddings of many nodes at once.
+
+    All packed float16 vectors are decoded with a single numpy conversion and
+    turned into Python float lists with one tolist() call, instead of once per
+    node. int8-quantized nodes are decoded individually.
+    """
+    nodes = [unpack_node_embedding(node) if QUANTIZED_EMBEDDING_FIELD in node else node for node in nodes]
+    packed_indices = [i for i, node in enumerate(nodes) if node.get(PACKED_EMBEDDING_FIELD) is not None]
+    if not packed_indices:
+        return list(nodes)
+
+    buffers = [base64.b64decode(nodes[i][PACKED_EMBEDDING_FIELD]) for i in packed_indices]
+    if len({len(buffer) for buffer in buffers}) > 1:
+        # Mixed dimensions, decode node by node
+        return [unpack_node_embedding(node) for node in nodes]
+
+    vectors = np.frombuffer(b"".join(buffers), dtype=np.float16).reshape(len(buffers), -1).astype(np.float32).tolist()
+
+    unpacked = list(nodes)
+    for i, vector in zip(packed_indices, vectors):
+        node = {key: value for key, value in nodes[i].items() if key != PACKED_EMBEDDING_FIELD}
+        node[EMBEDDING_FIELD] = vector
+        unpacked[i] = node
+    return unpacked
@@ -2,27 +2,77 @@
 Simple embedding service that can be called by an AI agent to create embeddings for nodes.
 """
 
+import hashlib
 import json
+import threading
+import numpy as np
+from collections import OrderedDict
 from typing import Dict, Any, List, Union, Optional
 from sentence_transformers import SentenceTransformer
 
+# Upper bound on characters per model token, used to cap text length before
+# tokenization. Anything past max_seq_length tokens is dropped by the model
+# anyway, so only the tokenization work on the tail is saved.
+MAX_CHARS_PER_TOKEN = 16
+
+# Text fields tried, in order, for node types without a dedicated extractor
+COMMON_TEXT_FIELDS = ('content', 'text', 'body', 'description', 'title')
+
+def _title_and_body_text(node: Dict[str, Any]) -> str:
+    """Text of a PR or issue: title followed by body"""
+    return f"{node.get('title', '')} {node.get('body', '')}"
+
+def _message_text(node: Dict[str, Any]) -> str:
+    """Text of a Slack message"""
+    return node.get('text', '')
+
+def _common_fields_text(node: Dict[str, Any]) -> str:
+    """Default case: join whichever common text fields the node has"""
+    return " ".join(node[field] for field in COMMON_TEXT_FIELDS if node.get(field))
+
+# Text extractor per node type, resolved once per collection
+TEXT_EXTRACTORS = {
+    "PullRequest": _title_and_body_text,
+    "Issue": _title_and_body_text,
+    "Message": _message_text
+}
+
+# Loaded models shared by all EmbeddingService instances in the process
+_models: Dict[str, SentenceTransformer] = {}
+_models_lock = threading.Lock()
+
+def _load_model(model_name: str) -> SentenceTransformer:
+    """Load a model once per process and reuse it for every later service"""
+    with _models_lock:
+        if model_name not in _models:
+            print(f"Loading model: {model_name}")
+            _models[model_name] = SentenceTransformer(model_name)
+            print(f"Model loaded with dimension: {_models[model_name].get_sentence_embedding_dimension()}")
+        return _models[model_name]
+
 class EmbeddingService:
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", cache_size: int = 10000):
         """
         Initialize the embedding service with a specific model.
         
         Args:
             model_name: Name of the sentence-transformers model to use
+            cache_size: Maximum number of text embeddings kept in the LRU cache
         """
         self.model_name = model_name
         self.model = None  # Lazy loading
+        
+        # LRU cache of embeddings keyed by the SHA-1 of the text
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
     
     def _ensure_model_loaded(self):
         """Ensure the model is loaded before use"""
         if self.model is None:
-            print(f"Loading model: {self.model_name}")
-            self.model = SentenceTransformer(self.model_name)
-            print(f"Model loaded with dimension: {self.model.get_sentence_embedding_dimension()}")
+            # Chunks may be embedded from several threads, and the pipeline may
+            # run many times per process; the model is loaded only once
+            self.model = _load_model(self.model_name)
     
     def get_text_for_embedding(self, node: Dict[str, Any], node_type: str) -> str:
         """
@@ -35,21 +85,24 @@ class EmbeddingService:
         Returns:
             Extracted text for embedding
         """
-        if node_type == "PullRequest":
-            return f"{node.get('title', '')} {node.get('body', '')}"
-        elif node_type == "Issue":
-            return f"{node.get('title', '')} {node.get('body', '')}"
-        elif node_type == "Message":
-            return node.get('text', '')
-        else:
-            # Default case: try to find common text fields
-            text_fields = ['content', 'text', 'body', 'description', 'title']
-            texts = []
-            for field in text_fields:
-                if field in node and node[field]:
-                    texts.append(node[field])
+        return TEXT_EXTRACTORS.get(node_type, _common_fields_text)(node)
+    
+    def get_texts_for_embedding(self, nodes: List[Dict[str, Any]], node_type: str) -> List[str]:
+        """
+        Extract text content from many nodes of the same type.
+        
+        The node type is dispatched once for the whole list, producing a list
+        of texts parallel to `nodes` that can be passed straight to embed_batch.
+        
+        Args:
+            nodes: The nodes, all of type `node_type`
+            node_type: Type of the nodes
             
-            return " ".join(texts)
+        Returns:
+            Extracted texts, in the same order as `nodes`
+        """
+        extract = TEXT_EXTRACTORS.get(node_type, _common_fields_text)
+        return [extract(node) for node in nodes]
     
     def create_embedding(self, node: Dict[str, Any], node_type: str) -> List[float]:
         """
@@ -70,10 +123,67 @@ class EmbeddingService:
             print(f"Warning: Empty text for node {node.get('id')}")
             return [0.0] * self.model.get_sentence_embedding_dimension()
         
-        embedding = self.model.encode(text)
+        # Truncate and normalize like embed_batch so single and batched embeddings agree
+        text = text[:self.model.max_seq_length * MAX_CHARS_PER_TOKEN]
+        embedding = self.model.encode(text, convert_to_numpy=True).astype(np.float32)
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding /= norm
         
         return embedding.tolist()
     
+    def embed_batch(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Create embeddings for many texts with batched model inference.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Number of texts per forward pass
+            
+        Returns:
+            Array of shape (len(texts), dimension); empty texts get a zero vector
+        """
+        self._ensure_model_loaded()
+        
+        dimension = self.model.get_sentence_embedding_dimension()
+        embeddings = np.zeros((len(texts), dimension), dtype=np.float32)
+        
+        # Only send non-empty texts to the model, matching create_embedding.
+        # Texts seen before come from the cache, and duplicates within the
+        # batch are encoded once.
+        max_chars = self.model.max_seq_length * MAX_CHARS_PER_TOKEN
+        misses = {}
+        with self._cache_lock:
+            for i, text in enumerate(texts):
+                if not text or not text.strip():
+                    continue
+                text = text[:max_chars]
+                key = hashlib.sha1(text.encode("utf-8")).digest()
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    embeddings[i] = cached
+                else:
+                    misses.setdefault(key, (text, []))[1].append(i)
+        
+        if misses:
+            encoded = self.model.encode(
+                [text for text, _ in misses.values()],
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+            
+            with self._cache_lock:
+                for (key, (_, indices)), embedding in zip(misses.items(), encoded):
+                    embeddings[indices] = embedding
+                    self._cache[key] = embedding
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        
+        return embeddings
+    
     def add_embedding_to_node(self, node: Dict[str, Any], node_type: str) -> Dict[str, Any]:
         """
         Add an embedding to a node.
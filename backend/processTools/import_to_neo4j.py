@@ -4,16 +4,40 @@ Script to import data with embeddings into a Neo4j graph database.
 
 import json
 import os
+import re
 import logging
 import argparse
+import queue
+import threading
 from typing import Dict, List, Any, Optional
 from neo4j_service import Neo4jService
+from embedding_codec import unpack_node_embeddings
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Number of nodes sent to Neo4j per UNWIND query
+NODE_BATCH_SIZE = 1000
+
+# Maximum number of prepared batches waiting for a writer (caps memory use)
+NODE_QUEUE_SIZE = 8
+
+# Marks the end of the batch stream for a worker
+_END_OF_BATCHES = None
+
+# Issue references in PR bodies, e.g. "Fixes #12", "related to #7" or "##7"
+PR_ISSUE_REFERENCE_RE = re.compile(r'(?:(fixes|closes|resolves|related to)\s+#|##)(\d+)', re.IGNORECASE)
+
+# PR and issue references in Slack message text, e.g. "PR 12", "issues/12" or "#12".
+# One alternation so each message is scanned once; any "#12" (including
+# "PR #12") may be either.
+MESSAGE_REFERENCE_RE = re.compile(
+    r'(?:(?P<pr>pr |pull request |pull/)|(?P<issue>issue |issues/)|#)(?P<number>\d+)',
+    re.IGNORECASE
+)
+
 # Node type mapping
 NODE_TYPE_LABELS = {
     "users": "User",
@@ -41,6 +65,8 @@ parser.add_argument('--create-indexes', action='store_true',
                     help='Create vector indexes for nodes with embeddings')
 parser.add_argument('--include-all-messages', action='store_true',
                     help='Include all Slack messages (including join messages)')
+parser.add_argument('--import-workers', type=int, default=4,
+                    help='Number of threads writing node batches to Neo4j')
 args = parser.parse_args()
 
 def load_data(file_path: str) -> Dict[str, Any]:
@@ -62,49 +88,103 @@ def clear_database(neo4j: Neo4jService) -> bool:
         logger.error(f"Error clearing database: {e}")
         return False
 
-def import_nodes(neo4j: Neo4jService, data: Dict[str, Any]) -> Dict[str, int]:
-    """Import nodes from data into Neo4j"""
-    results = {}
+class Neo4jImportWorker(threading.Thread):
+    """
+    Writes node batches from a queue to Neo4j.
     
-    for collection_name, nodes in data.items():
-        if collection_name not in NODE_TYPE_LABELS:
-            logger.info(f"Skipping collection {collection_name} - no mapping defined")
-            continue
-        
-        label = NODE_TYPE_LABELS[collection_name]
-        
-        # Filter out join messages unless --include-all-messages is specified
-        if collection_name == "slackMessages" and not args.include_all_messages:
-            original_count = len(nodes)
-            nodes = [msg for msg in nodes if not msg.get("text", "").endswith("has joined the channel")]
-            filtered_count = original_count - len(nodes)
-            logger.info(f"Filtered out {filtered_count} join messages from {original_count} total messages")
-        
-        logger.info(f"Importing {len(nodes)} {label} nodes")
-        
-        success_count = 0
-        for node in nodes:
-            # For User nodes, ensure slackId is preserved if it exists
-            if label == "User" and "slackId" in node:
-                logger.info(f"User {node.get('name', 'Unknown')} has slackId: {node['slackId']}")
+    Each batch runs in its own session from the shared driver, which is
+    thread-safe (sessions are not).
+    """
+    
+    def __init__(self, neo4j: Neo4jService, batch_queue: queue.Queue):
+        super().__init__(daemon=True)
+        self.neo4j = neo4j
+        self.batch_queue = batch_queue
+        self.counts: Dict[str, int] = {}
+    
+    def run(self):
+        while True:
+            batch = self.batch_queue.get()
+            if batch is _END_OF_BATCHES:
+                break
+            
+            label, rows = batch
+            self.counts[label] = self.counts.get(label, 0) + self.neo4j.create_nodes_bulk(label, rows)
+
+def produce_node_batches(data: Dict[str, Any], batch_queue: queue.Queue, num_workers: int, totals: Dict[str, int]):
+    """Prepare node batches and push them onto the queue, followed by one end marker per worker"""
+    try:
+        for collection_name, nodes in data.items():
+            if collection_name not in NODE_TYPE_LABELS:
+                logger.info(f"Skipping collection {collection_name} - no mapping defined")
+                continue
             
-            # Log when PullRequest nodes have authorLogin
-            if label == "PullRequest" and "authorLogin" in node:
-                logger.info(f"PullRequest #{node.get('number', 'Unknown')} has authorLogin: {node['authorLogin']}")
+            label = NODE_TYPE_LABELS[collection_name]
             
-            # Log when Issue nodes have authorLogin
-            if label == "Issue" and "authorLogin" in node:
-                logger.info(f"Issue #{node.get('number', 'Unknown')} has authorLogin: {node['authorLogin']}")
+            # Filter out join messages unless --include-all-messages is specified
+            if collection_name == "slackMessages" and not args.include_all_messages:
+                original_count = len(nodes)
+                nodes = [msg for msg in nodes if not msg.get("text", "").endswith("has joined the channel")]
+                filtered_count = original_count - len(nodes)
+                logger.info(f"Filtered out {filtered_count} join messages from {original_count} total messages")
             
-            # Log when Message nodes have author information
-            if label == "Message" and "authorId" in node and "authorLogin" in node:
-                logger.info(f"Message {node.get('id', 'Unknown')} connected to author: {node['authorLogin']}")
+            logger.info(f"Importing {len(nodes)} {label} nodes")
+            totals[label] = len(nodes)
             
-            if neo4j.create_node(label, node):
-                success_count += 1
-        
+            for start in range(0, len(nodes), NODE_BATCH_SIZE):
+                # Expand packed float16 embeddings into the float lists Neo4j indexes
+                batch = unpack_node_embeddings(nodes[start:start + NODE_BATCH_SIZE])
+                
+                for node in batch:
+                    # For User nodes, ensure slackId is preserved if it exists
+                    if label == "User" and "slackId" in node:
+                        logger.info(f"User {node.get('name', 'Unknown')} has slackId: {node['slackId']}")
+                    
+                    # Log when PullRequest nodes have authorLogin
+                    if label == "PullRequest" and "authorLogin" in node:
+                        logger.info(f"PullRequest #{node.get('number', 'Unknown')} has authorLogin: {node['authorLogin']}")
+                    
+                    # Log when Issue nodes have authorLogin
+                    if label == "Issue" and "authorLogin" in node:
+                        logger.info(f"Issue #{node.get('number', 'Unknown')} has authorLogin: {node['authorLogin']}")
+                    
+                    # Log when Message nodes have author information
+                    if label == "Message" and "authorId" in node and "authorLogin" in node:
+                        logger.info(f"Message {node.get('id', 'Unknown')} connected to author: {node['authorLogin']}")
+                
+                batch_queue.put((label, batch))
+    finally:
+        for _ in range(num_workers):
+            batch_queue.put(_END_OF_BATCHES)
+
+def import_nodes(neo4j: Neo4jService, data: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Import nodes from data into Neo4j.
+    
+    Batches are prepared on the calling thread while worker threads write
+    earlier batches, so embedding decoding overlaps with the Neo4j round trips.
+    """
+    num_workers = max(1, args.import_workers)
+    batch_queue = queue.Queue(maxsize=NODE_QUEUE_SIZE)
+    totals: Dict[str, int] = {}
+    
+    workers = [Neo4jImportWorker(neo4j, batch_queue) for _ in range(num_workers)]
+    for worker in workers:
+        worker.start()
+    
+    # Batches are prepared on this thread, so a failure while preparing them
+    # propagates to the caller instead of passing for a partial import
+    try:
+        produce_node_batches(data, batch_queue, num_workers, totals)
+    finally:
+        for worker in workers:
+            worker.join()
+    
+    results = {}
+    for label, total in totals.items():
+        success_count = sum(worker.counts.get(label, 0) for worker in workers)
         results[label] = success_count
-        logger.info(f"Imported {success_count}/{len(nodes)} {label} nodes")
+        logger.info(f"Imported {success_count}/{total} {label} nodes")
     
     return results
 
@@ -117,12 +197,9 @@ def create_relationships(neo4j: Neo4jService, data: Dict[str, Any]) -> Dict[str,
         rel_type = "AUTHORED"
         logger.info(f"Creating {rel_type} relationships for Pull Requests")
         
-        success_count = 0
-        for pr in data["pullRequests"]:
-            author_id = pr.get("authorId")
-            if author_id:
-                if neo4j.create_relationship("User", author_id, "PullRequest", pr["id"], rel_type):
-                    success_count += 1
+        rows = [{"from_id": pr["authorId"], "to_id": pr["id"]}
+                for pr in data["pullRequests"] if pr.get("authorId")]
+        success_count = neo4j.create_relationships_bulk("User", "PullRequest", rel_type, rows)
         
         results[f"User-{rel_type}->PullRequest"] = success_count
         logger.info(f"Created {success_count} {rel_type} relationships")
@@ -132,12 +209,9 @@ def create_relationships(neo4j: Neo4jService, data: Dict[str, Any]) -> Dict[str,
         rel_type = "AUTHORED"
         logger.info(f"Creating {rel_type} relationships for Issues")
         
-        success_count = 0
-        for issue in data["issues"]:
-            author_id = issue.get("authorId")
-            if author_id:
-                if neo4j.create_relationship("User", author_id, "Issue", issue["id"], rel_type):
-                    success_count += 1
+        rows = [{"from_id": issue["authorId"], "to_id": issue["id"]}
+                for issue in data["issues"] if issue.get("authorId")]
+        success_count = neo4j.create_relationships_bulk("User", "Issue", rel_type, rows)
         
         results[f"User-{rel_type}->Issue"] = success_count
         logger.info(f"Created {success_count} {rel_type} relationships")
@@ -147,21 +221,13 @@ def create_relationships(neo4j: Neo4jService, data: Dict[str, Any]) -> Dict[str,
         rel_type = "BELONGS_TO"
         logger.info(f"Creating {rel_type} relationships for PRs and Issues")
         
-        pr_count = 0
-        if "pullRequests" in data:
-            for pr in data["pullRequests"]:
-                repo_id = pr.get("repositoryId")
-                if repo_id:
-                    if neo4j.create_relationship("PullRequest", pr["id"], "Repository", repo_id, rel_type):
-                        pr_count += 1
-        
-        issue_count = 0
-        if "issues" in data:
-            for issue in data["issues"]:
-                repo_id = issue.get("repositoryId")
-                if repo_id:
-                    if neo4j.create_relationship("Issue", issue["id"], "Repository", repo_id, rel_type):
-                        issue_count += 1
+        pr_rows = [{"from_id": pr["id"], "to_id": pr["repositoryId"]}
+                   for pr in data.get("pullRequests", []) if pr.get("repositoryId")]
+        pr_count = neo4j.create_relationships_bulk("PullRequest", "Repository", rel_type, pr_rows)
+        
+        issue_rows = [{"from_id": issue["id"], "to_id": issue["repositoryId"]}
+                      for issue in data.get("issues", []) if issue.get("repositoryId")]
+        issue_count = neo4j.create_relationships_bulk("Issue", "Repository", rel_type, issue_rows)
         
         results[f"PullRequest-{rel_type}->Repository"] = pr_count
         results[f"Issue-{rel_type}->Repository"] = issue_count
@@ -172,34 +238,34 @@ def create_relationships(neo4j: Neo4jService, data: Dict[str, Any]) -> Dict[str,
         rel_type = "REFERENCES"
         logger.info(f"Creating {rel_type} relationships between PRs and Issues")
         
-        success_count = 0
-        # This is a simplified approach - in a real system you'd parse the PR body
-        # to extract issue references like "fixes #123" or "closes #456"
+        # Index issues by number so each reference is a dict lookup; malformed
+        # numbers can't be referenced, so those issues are skipped
+        issue_number_to_ids = {}
+        for issue in data["issues"]:
+            issue_number = issue.get("number")
+            if issue_number and str(issue_number).isdigit():
+                issue_number_to_ids.setdefault(int(issue_number), []).append(issue["id"])
+        
+        rows = []
         for pr in data["pullRequests"]:
             # Fix to safely handle None values in body
             body = pr.get("body", "") or ""
-            body = body.lower()
             
-            # Find issues referenced in the PR body
-            for issue in data["issues"]:
-                issue_number = issue.get("number")
-                if not issue_number:
-                    continue
-                
-                # Check for common reference patterns
-                reference_patterns = [
-                    f"fixes #{issue_number}",
-                    f"closes #{issue_number}",
-                    f"resolves #{issue_number}",
-                    f"related to #{issue_number}",
-                    f"##{issue_number}"
-                ]
-                
-                referenced = any(pattern in body for pattern in reference_patterns)
-                if referenced:
-                    properties = {"referenceType": "fixes" if "fixes" in body else "related"}
-                    if neo4j.create_relationship("PullRequest", pr["id"], "Issue", issue["id"], rel_type, properties):
-                        success_count += 1
+            # Collect referenced issue numbers in one pass; "fixes" wins over
+            # a weaker reference to the same issue
+            referenced = {}
+            for match in PR_ISSUE_REFERENCE_RE.finditer(body):
+                verb = match.group(1)
+                reference_type = "fixes" if verb and verb.lower() == "fixes" else "related"
+                issue_number = int(match.group(2))
+                if referenced.get(issue_number) != "fixes":
+                    referenced[issue_number] = reference_type
+            
+            rows.extend({"from_id": pr["id"], "to_id": issue_id, "props": {"referenceType": reference_type}}
+                        for issue_number, reference_type in referenced.items()
+                        for issue_id in issue_number_to_ids.get(issue_number, []))
+        
+        success_count = neo4j.create_relationships_bulk("PullRequest", "Issue", rel_type, rows)
         
         results[f"PullRequest-{rel_type}->Issue"] = success_count
         logger.info(f"Created {success_count} {rel_type} relationships")
@@ -214,12 +280,9 @@ def create_relationships(neo4j: Neo4jService, data: Dict[str, Any]) -> Dict[str,
         if not args.include_all_messages:
             slack_messages = [msg for msg in slack_messages if not msg.get("text", "").endswith("has joined the channel")]
         
-        success_count = 0
-        for msg in slack_messages:
-            author_id = msg.get("authorId")
-            if author_id:
-                if neo4j.create_relationship("User", author_id, "Message", msg["id"], rel_type):
-                    success_count += 1
+        rows = [{"from_id": msg["authorId"], "to_id": msg["id"]}
+                for msg in slack_messages if msg.get("authorId")]
+        success_count = neo4j.create_relationships_bulk("User", "Message", rel_type, rows)
         
         results[f"User-{rel_type}->Message"] = success_count
         logger.info(f"Created {success_count} {rel_type} relationships")
@@ -234,12 +297,9 @@ def create_relationships(neo4j: Neo4jService, data: Dict[str, Any]) -> Dict[str,
         if not args.include_all_messages:
             slack_messages = [msg for msg in slack_messages if not msg.get("text", "").endswith("has joined the channel")]
         
-        success_count = 0
-        for msg in slack_messages:
-            channel_id = msg.get("channelId")
-            if channel_id:
-                if neo4j.create_relationship("Message", msg["id"], "Channel", channel_id, rel_type):
-                    success_count += 1
+        rows = [{"from_id": msg["id"], "to_id": msg["channelId"]}
+                for msg in slack_messages if msg.get("channelId")]
+        success_count = neo4j.create_relationships_bulk("Message", "Channel", rel_type, rows)
         
         results[f"Message-{rel_type}->Channel"] = success_count
         logger.info(f"Created {success_count} {rel_type} relationships")
@@ -258,27 +318,17 @@ def create_relationships(neo4j: Neo4jService, data: Dict[str, Any]) -> Dict[str,
         thread_ts_count = sum(1 for msg in slack_messages if msg.get("threadTs"))
         logger.info(f"Found {thread_ts_count} messages with threadTs field")
         
-        # Create a mapping of threadTs to message IDs
-        thread_ts_to_id = {}
-        ts_to_id = {}
-        for msg in slack_messages:
-            # Map the message timestamp (in createdAt) to its ID
-            created_at = msg.get("createdAt")
-            if created_at:
-                # Convert to string format that matches threadTs
-                ts_value = created_at.replace('Z', '')
-                ts_to_id[ts_value] = msg["id"]
-                logger.info(f"Mapped timestamp {ts_value} to message ID {msg['id']}")
+        # Map the message timestamp (in createdAt, without the trailing 'Z' so it
+        # matches threadTs) to its ID
+        ts_to_id = {msg["createdAt"].replace('Z', ''): msg["id"]
+                    for msg in slack_messages if msg.get("createdAt")}
+        logger.info(f"Mapped {len(ts_to_id)} message timestamps to message IDs")
         
-        success_count = 0
-        for msg in slack_messages:
-            thread_ts = msg.get("threadTs")
-            if thread_ts and thread_ts in ts_to_id:
-                parent_id = ts_to_id[thread_ts]
-                # Don't create a relationship to itself
-                if parent_id != msg["id"]:
-                    if neo4j.create_relationship("Message", msg["id"], "Message", parent_id, rel_type):
-                        success_count += 1
+        # Don't create a relationship from a message to itself
+        rows = [{"from_id": msg["id"], "to_id": ts_to_id[msg["threadTs"]]}
+                for msg in slack_messages
+                if msg.get("threadTs") in ts_to_id and ts_to_id[msg["threadTs"]] != msg["id"]]
+        success_count = neo4j.create_relationships_bulk("Message", "Message", rel_type, rows)
         
         results[f"Message-{rel_type}->Message"] = success_count
         logger.info(f"Created {success_count} {rel_type} relationships")
@@ -300,78 +350,70 @@ def create_relationships(neo4j: Neo4jService, data: Dict[str, Any]) -> Dict[str,
         pr_refs = 0
         issue_refs = 0
         
-        # Create a set of all PR numbers and their IDs for quicker lookup
+        # Bind the GitHub collections once instead of re-checking them per message
+        prs = data.get("pullRequests", [])
+        issues = data.get("issues", [])
+        
+        # Index PRs by number, ID (for the author) and author login in one pass,
+        # leaving malformed numbers out of the number index
         pr_number_to_id = {}
-        if "pullRequests" in data:
-            for pr in data["pullRequests"]:
-                pr_number = pr.get("number")
-                if pr_number:
-                    pr_number_to_id[pr_number] = pr["id"]
-            logger.info(f"Indexed {len(pr_number_to_id)} PR numbers for reference matching")
-        
-        # Create a set of all issue numbers and their IDs for quicker lookup
-        issue_number_to_id = {}
-        if "issues" in data:
-            for issue in data["issues"]:
-                issue_number = issue.get("number")
-                if issue_number:
-                    issue_number_to_id[issue_number] = issue["id"]
-            logger.info(f"Indexed {len(issue_number_to_id)} issue numbers for reference matching")
-        
-        # Create a mapping of GitHub logins to PR and issue IDs
+        pr_id_to_author = {}
         author_login_to_prs = {}
+        for pr in prs:
+            pr_number = pr.get("number")
+            if pr_number and str(pr_number).isdigit():
+                pr_number_to_id[int(pr_number)] = pr["id"]
+            author_login = pr.get("authorLogin")
+            pr_id_to_author[pr["id"]] = author_login
+            if author_login:
+                author_login_to_prs.setdefault(author_login, []).append(pr["id"])
+        
+        # Same indexes for issues
+        issue_number_to_id = {}
+        issue_id_to_author = {}
         author_login_to_issues = {}
+        for issue in issues:
+            issue_number = issue.get("number")
+            if issue_number and str(issue_number).isdigit():
+                issue_number_to_id[int(issue_number)] = issue["id"]
+            author_login = issue.get("authorLogin")
+            issue_id_to_author[issue["id"]] = author_login
+            if author_login:
+                author_login_to_issues.setdefault(author_login, []).append(issue["id"])
         
-        if "pullRequests" in data:
-            for pr in data["pullRequests"]:
-                author_login = pr.get("authorLogin")
-                if author_login:
-                    if author_login not in author_login_to_prs:
-                        author_login_to_prs[author_login] = []
-                    author_login_to_prs[author_login].append(pr["id"])
-            
-            logger.info(f"Mapped {len(author_login_to_prs)} GitHub logins to their PRs")
-        
-        if "issues" in data:
-            for issue in data["issues"]:
-                author_login = issue.get("authorLogin")
-                if author_login:
-                    if author_login not in author_login_to_issues:
-                        author_login_to_issues[author_login] = []
-                    author_login_to_issues[author_login].append(issue["id"])
-            
-            logger.info(f"Mapped {len(author_login_to_issues)} GitHub logins to their issues")
+        logger.info(f"Indexed {len(pr_number_to_id)} PR numbers and {len(issue_number_to_id)} issue numbers for reference matching")
+        logger.info(f"Mapped {len(author_login_to_prs)} GitHub logins to their PRs and {len(author_login_to_issues)} to their issues")
+        
+        # Collect rows per relationship type and write each set in bulk
+        pr_mention_rows = []
+        issue_mention_rows = []
+        pr_author_rows = []
+        issue_author_rows = []
         
         # Process each Slack message
         for msg in slack_messages:
-            text = msg.get("text", "").lower()
+            text = msg.get("text", "")
             author_login = msg.get("authorLogin")
             
             # Skip messages without text
-            if not text or text == "":
+            if not text:
                 continue
             
+            # Split references into PR and issue numbers in a single scan
+            pr_numbers = set()
+            issue_numbers = set()
+            for match in MESSAGE_REFERENCE_RE.finditer(text):
+                number = int(match.group("number"))
+                if not match.group("issue"):
+                    pr_numbers.add(number)
+                if not match.group("pr"):
+                    issue_numbers.add(number)
+            
             # Check for PR references in text
-            for pr_number in pr_number_to_id:
-                # Check for common reference patterns
-                pr_patterns = [
-                    f"pr #{pr_number}",
-                    f"pr#{pr_number}",
-                    f"pr {pr_number}",
-                    f"pull request #{pr_number}",
-                    f"pull request {pr_number}",
-                    f"pull/{pr_number}",
-                    f"#{pr_number}"
-                ]
-                
-                if any(pattern in text for pattern in pr_patterns):
+            for pr_number in pr_numbers:
+                if pr_number in pr_number_to_id:
                     pr_id = pr_number_to_id[pr_number]
-                    # Find the PR's author login for comparison
-                    pr_author = None
-                    for pr in data["pullRequests"]:
-                        if pr["id"] == pr_id:
-                            pr_author = pr.get("authorLogin")
-                            break
+                    pr_author = pr_id_to_author.get(pr_id)
                     
                     # Check if this PR was authored by the message author
                     is_author_match = author_login and pr_author and author_login == pr_author
@@ -380,30 +422,13 @@ def create_relationships(neo4j: Neo4jService, data: Dict[str, Any]) -> Dict[str,
                         "referenceType": "mention",
                         "authorMatch": is_author_match
                     }
-                    
-                    if neo4j.create_relationship("Message", msg["id"], "PullRequest", pr_id, rel_type, properties):
-                        pr_refs += 1
-                        logger.info(f"Created {rel_type} from message to PR #{pr_number}")
+                    pr_mention_rows.append({"from_id": msg["id"], "to_id": pr_id, "props": properties})
             
             # Check for Issue references in text
-            for issue_number in issue_number_to_id:
-                # Check for common reference patterns
-                issue_patterns = [
-                    f"issue #{issue_number}",
-                    f"issue#{issue_number}",
-                    f"issue {issue_number}",
-                    f"#{issue_number}",
-                    f"issues/{issue_number}"
-                ]
-                
-                if any(pattern in text for pattern in issue_patterns):
+            for issue_number in issue_numbers:
+                if issue_number in issue_number_to_id:
                     issue_id = issue_number_to_id[issue_number]
-                    # Find the issue's author login for comparison
-                    issue_author = None
-                    for issue in data["issues"]:
-                        if issue["id"] == issue_id:
-                            issue_author = issue.get("authorLogin")
-                            break
+                    issue_author = issue_id_to_author.get(issue_id)
                     
                     # Check if this issue was authored by the message author
                     is_author_match = author_login and issue_author and author_login == issue_author
@@ -412,33 +437,29 @@ def create_relationships(neo4j: Neo4jService, data: Dict[str, Any]) -> Dict[str,
                         "referenceType": "mention",
                         "authorMatch": is_author_match
                     }
-                    
-                    if neo4j.create_relationship("Message", msg["id"], "Issue", issue_id, rel_type, properties):
-                        issue_refs += 1
-                        logger.info(f"Created {rel_type} from message to Issue #{issue_number}")
+                    issue_mention_rows.append({"from_id": msg["id"], "to_id": issue_id, "props": properties})
             
             # If message has author login, also connect to all PRs/issues created by this author
             if author_login:
+                properties = {
+                    "referenceType": "author_context",
+                    "authorMatch": True
+                }
+                
                 # Connect to all PRs by this author
-                if author_login in author_login_to_prs:
-                    for pr_id in author_login_to_prs[author_login]:
-                        # Only create a relationship if not already mentioned explicitly
-                        properties = {
-                            "referenceType": "author_context",
-                            "authorMatch": True
-                        }
-                        if neo4j.create_relationship("Message", msg["id"], "PullRequest", pr_id, f"{rel_type}_BY_AUTHOR", properties):
-                            pr_refs += 1
+                for pr_id in author_login_to_prs.get(author_login, []):
+                    pr_author_rows.append({"from_id": msg["id"], "to_id": pr_id, "props": properties})
                 
                 # Connect to all issues by this author
-                if author_login in author_login_to_issues:
-                    for issue_id in author_login_to_issues[author_login]:
-                        properties = {
-                            "referenceType": "author_context",
-                            "authorMatch": True
-                        }
-                        if neo4j.create_relationship("Message", msg["id"], "Issue", issue_id, f"{rel_type}_BY_AUTHOR", properties):
-                            issue_refs += 1
+                for issue_id in author_login_to_issues.get(author_login, []):
+                    issue_author_rows.append({"from_id": msg["id"], "to_id": issue_id, "props": properties})
+        
+        logger.info(f"Found {len(pr_mention_rows)} PR and {len(issue_mention_rows)} Issue mentions in messages")
+        
+        pr_refs += neo4j.create_relationships_bulk("Message", "PullRequest", rel_type, pr_mention_rows)
+        issue_refs += neo4j.create_relationships_bulk("Message", "Issue", rel_type, issue_mention_rows)
+        pr_refs += neo4j.create_relationships_bulk("Message", "PullRequest", f"{rel_type}_BY_AUTHOR", pr_author_rows)
+        issue_refs += neo4j.create_relationships_bulk("Message", "Issue", f"{rel_type}_BY_AUTHOR", issue_author_rows)
         
         results[f"Message-{rel_type}->PullRequest"] = pr_refs
         results[f"Message-{rel_type}->Issue"] = issue_refs
@@ -449,22 +470,19 @@ def create_relationships(neo4j: Neo4jService, data: Dict[str, Any]) -> Dict[str,
         rel_type = "CHUNKED_FROM"
         logger.info(f"Creating {rel_type} relationships for TextChunks")
         
+        # Map source type to label
+        source_labels = {
+            "PullRequest": "PullRequest",
+            "Issue": "Issue",
+            "SlackMessage": "Message"
+        }
+        
         success_count = 0
-        for chunk in data["textChunks"]:
-            source_id = chunk.get("sourceId")
-            source_type = chunk.get("sourceType")
-            
-            if source_id and source_type:
-                # Map source type to label
-                if source_type == "PullRequest":
-                    if neo4j.create_relationship("TextChunk", chunk["id"], "PullRequest", source_id, rel_type):
-                        success_count += 1
-                elif source_type == "Issue":
-                    if neo4j.create_relationship("TextChunk", chunk["id"], "Issue", source_id, rel_type):
-                        success_count += 1
-                elif source_type == "SlackMessage":
-                    if neo4j.create_relationship("TextChunk", chunk["id"], "Message", source_id, rel_type):
-                        success_count += 1
+        for source_type, source_label in source_labels.items():
+            rows = [{"from_id": chunk["id"], "to_id": chunk["sourceId"]}
+                    for chunk in data["textChunks"]
+                    if chunk.get("sourceId") and chunk.get("sourceType") == source_type]
+            success_count += neo4j.create_relationships_bulk("TextChunk", source_label, rel_type, rows)
         
         results[f"TextChunk-{rel_type}->Source"] = success_count
         logger.info(f"Created {success_count} {rel_type} relationships")
@@ -518,6 +536,12 @@ def main():
         neo4j.close()
         return
     
+    # Create vector indexes if requested, before the import so they are
+    # populated incrementally instead of built over the full graph afterwards
+    if args.create_indexes:
+        index_results = create_vector_indexes(neo4j)
+        logger.info(f"Vector index creation results: {index_results}")
+    
     # Import nodes
     node_results = import_nodes(neo4j, data)
     logger.info(f"Node import results: {node_results}")
@@ -526,11 +550,6 @@ def main():
     rel_results = create_relationships(neo4j, data)
     logger.info(f"Relationship creation results: {rel_results}")
     
-    # Create vector indexes if requested
-    if args.create_indexes:
-        index_results = create_vector_indexes(neo4j)
-        logger.info(f"Vector index creation results: {index_results}")
-    
     # Close Neo4j connection
     neo4j.close()
     
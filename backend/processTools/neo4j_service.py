@@ -3,6 +3,8 @@ Neo4j service to handle interactions with the Neo4j graph database.
 """
 
 from neo4j import GraphDatabase
+from neo4j.exceptions import CypherSyntaxError
+from contextlib import contextmanager
 from typing import Dict, List, Any, Optional, Tuple
 import logging
 
@@ -21,6 +23,16 @@ class Neo4jService:
         self.password = password
         self.driver = None
         self.logger = logging.getLogger(__name__)
+        # Server version, queried once on first use
+        self._server_version = None
+        # Whether the server accepts CREATE VECTOR INDEX (None until first attempt)
+        self._supports_vector_index = None
+        # Shared session/transaction used by create_node/create_relationship
+        # inside bulk_session()
+        self._current_session = None
+        self._current_tx = None
+        self._pending_writes = []
+        self._commit_every = 0
     
     def connect(self):
         """Establish connection to Neo4j database"""
@@ -48,6 +60,70 @@ class Neo4jService:
         """Context manager exit"""
         self.close()
     
+    @contextmanager
+    def bulk_session(self, commit_every: int = 1000):
+        """
+        Group create_node/create_relationship calls into shared transactions.
+        
+        Inside the block the one-shot write methods reuse a single session and
+        commit every `commit_every` writes instead of opening a session per
+        call. Not thread-safe; use create_nodes_bulk from worker threads.
+        
+        Args:
+            commit_every: Number of writes per transaction
+        """
+        if not self.driver:
+            if not self.connect():
+                raise RuntimeError("Could not connect to Neo4j")
+        
+        self._current_session = self.driver.session()
+        self._current_tx = self._current_session.begin_transaction()
+        self._pending_writes = []
+        self._commit_every = commit_every
+        try:
+            yield self
+            self._current_tx.commit()
+        except Exception:
+            self._current_tx.rollback()
+            raise
+        finally:
+            self._current_session.close()
+            self._current_session = None
+            self._current_tx = None
+            self._pending_writes = []
+    
+    def _run_write(self, query: str, **params) -> bool:
+        """Run a single-row write query and return whether it produced a record"""
+        if self._current_tx is None:
+            with self.driver.session() as session:
+                return session.run(query, **params).single() is not None
+        
+        try:
+            written = self._current_tx.run(query, **params).single() is not None
+        except Exception:
+            # A failed statement invalidates the whole transaction, so replay
+            # the writes already reported as successful and commit them; only
+            # the failing row is lost
+            self._current_tx.rollback()
+            self._current_tx = self._current_session.begin_transaction()
+            self.logger.error(f"Write failed; replaying {len(self._pending_writes)} uncommitted writes")
+            for pending_query, pending_params in self._pending_writes:
+                self._current_tx.run(pending_query, **pending_params).consume()
+            self._commit_pending()
+            raise
+        
+        self._pending_writes.append((query, params))
+        if len(self._pending_writes) >= self._commit_every:
+            self._commit_pending()
+        
+        return written
+    
+    def _commit_pending(self):
+        """Commit the open bulk_session transaction and start a new one"""
+        self._current_tx.commit()
+        self._current_tx = self._current_session.begin_transaction()
+        self._pending_writes = []
+    
     def test_connection(self) -> int:
         """Test the Neo4j connection and return node count"""
         if not self.driver:
@@ -91,6 +167,24 @@ class Neo4jService:
         
         return success
     
+    def _get_server_version(self) -> str:
+        """Return the Neo4j server version, querying it only on first use"""
+        if self._server_version is None:
+            with self.driver.session() as session:
+                result = session.run("CALL dbms.components() YIELD versions RETURN versions[0] as version")
+                record = result.single()
+                self._server_version = record["version"] if record else "0.0.0"
+        
+        return self._server_version
+    
+    def _server_version_at_least(self, major: int, minor: int) -> bool:
+        """Check the cached server version against a minimum major.minor"""
+        try:
+            server_major, server_minor = map(int, self._get_server_version().split('.')[:2])
+        except ValueError:
+            return False
+        return (server_major, server_minor) >= (major, minor)
+    
     def create_vector_index(self, label: str, property_name: str = "embedding", dimension: int = 384):
         """
         Create a vector index for a node label and property.
@@ -104,19 +198,14 @@ class Neo4jService:
             if not self.connect():
                 return False
         
-        # Check Neo4j version - vector indexes are available in Neo4j 5.11+
+        # Vector indexes are available in Neo4j 5.11+; once the server has
+        # rejected the syntax, don't try again
+        if self._supports_vector_index is False:
+            return False
+        
         try:
             with self.driver.session() as session:
-                result = session.run("CALL dbms.components() YIELD versions RETURN versions[0] as version")
-                record = result.single()
-                version = record["version"] if record else "0.0.0"
-                
-                major, minor, _ = map(int, version.split('.', 2))
-                if major < 5 or (major == 5 and minor < 11):
-                    self.logger.error(f"Vector indexes require Neo4j 5.11+, but found {version}")
-                    return False
-                
-                # Create vector index
+                # Create vector index directly instead of probing the version first
                 index_name = f"{label.lower()}_embedding_idx"
                 query = f"""
                 CREATE VECTOR INDEX {index_name} IF NOT EXISTS
@@ -128,10 +217,15 @@ class Neo4jService:
                 }}}}
                 """
                 
-                session.run(query)
+                session.run(query).consume()
+                self._supports_vector_index = True
                 self.logger.info(f"Created vector index: {index_name}")
                 return True
                 
+        except CypherSyntaxError as e:
+            self._supports_vector_index = False
+            self.logger.error(f"Vector indexes require Neo4j 5.11+: {e}")
+            return False
         except Exception as e:
             self.logger.error(f"Error creating vector index: {e}")
             return False
@@ -158,21 +252,85 @@ class Neo4jService:
             return False
         
         try:
-            with self.driver.session() as session:
-                # Merge on ID to avoid duplicates
-                query = f"""
-                MERGE (n:{label} {{id: $id}})
-                SET n += $properties
-                RETURN n.id
-                """
-                
-                result = session.run(query, id=node_id, properties=properties)
-                return result.single() is not None
-                
+            # Merge on ID to avoid duplicates
+            query = f"""
+            MERGE (n:{label} {{id: $id}})
+            SET n += $properties
+            RETURN n.id
+            """
+            
+            return self._run_write(query, id=node_id, properties=properties)
+            
         except Exception as e:
             self.logger.error(f"Error creating node: {e}")
             return False
     
+    def create_nodes_bulk(self, label: str, nodes: List[Dict[str, Any]]) -> int:
+        """
+        Create many nodes with a single UNWIND query.
+        
+        Args:
+            label: Node label
+            nodes: Property maps of the nodes; each must include an 'id'
+            
+        Returns:
+            Number of nodes created or updated
+        """
+        if not self.driver:
+            if not self.connect():
+                return 0
+        
+        rows = [node for node in nodes if node.get("id")]
+        if len(rows) < len(nodes):
+            self.logger.error(f"Skipping {len(nodes) - len(rows)} {label} nodes without an 'id'")
+        if not rows:
+            return 0
+        
+        try:
+            with self.driver.session() as session:
+                return self._merge_node_rows(session, label, rows)
+                
+        except Exception as e:
+            self.logger.error(f"Error creating {label} nodes: {e}")
+            return 0
+    
+    def _merge_node_rows(self, session, label: str, rows: List[Dict[str, Any]]) -> int:
+        """
+        Merge node rows with one UNWIND query, splitting the batch on failure.
+        
+        A batch that fails (e.g. because one row has a property value Neo4j
+        rejects) is retried in halves, so only the bad rows are lost and
+        their ids are logged.
+        
+        Args:
+            session: Session to run the queries in
+            label: Node label
+            rows: Property maps of the nodes, each with an 'id'
+            
+        Returns:
+            Number of nodes created or updated
+        """
+        # Merge on ID to avoid duplicates
+        query = f"""
+        UNWIND $rows AS row
+        MERGE (n:{label} {{id: row.id}})
+        SET n += row
+        RETURN count(n) AS count
+        """
+        
+        try:
+            record = session.run(query, rows=rows).single()
+            return record["count"] if record else 0
+        except Exception as e:
+            if len(rows) == 1:
+                self.logger.error(f"Error creating {label} node {rows[0]['id']}: {e}")
+                return 0
+            
+            self.logger.debug(f"Error creating {len(rows)} {label} nodes in one batch, retrying in halves: {e}")
+            middle = len(rows) // 2
+            return (self._merge_node_rows(session, label, rows[:middle])
+                    + self._merge_node_rows(session, label, rows[middle:]))
+    
     def create_relationship(self, from_label: str, from_id: str, 
                            to_label: str, to_id: str, 
                            rel_type: str, properties: Optional[Dict[str, Any]] = None) -> bool:
@@ -194,25 +352,128 @@ class Neo4jService:
             if not self.connect():
                 return False
         
-        if properties is None:
-            properties = {}
+        try:
+            # Skip the SET entirely for relationships without properties
+            set_clause = "SET r += $properties" if properties else ""
+            query = f"""
+            MATCH (a:{from_label} {{id: $from_id}})
+            MATCH (b:{to_label} {{id: $to_id}})
+            MERGE (a)-[r:{rel_type}]->(b)
+            {set_clause}
+            RETURN type(r)
+            """
+            
+            return self._run_write(query, from_id=from_id, to_id=to_id, properties=properties or {})
+            
+        except Exception as e:
+            self.logger.error(f"Error creating relationship: {e}")
+            return False
+    
+    def create_relationships_bulk(self, from_label: str, to_label: str, rel_type: str,
+                                  rows: List[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """
+        Create many relationships of one type.
+        
+        The write strategy depends on the server: Neo4j 5.21+ uses
+        CALL {} IN CONCURRENT TRANSACTIONS, 5.11-5.20 uses apoc.periodic.iterate
+        with parallel batches, and anything else (or a server without APOC)
+        falls back to serial UNWIND batches.
+        
+        Args:
+            from_label: Label of the source nodes
+            to_label: Label of the target nodes
+            rel_type: Relationship type
+            rows: Dicts with 'from_id', 'to_id' and optional 'props'
+            batch_size: Number of rows per transaction
+            
+        Returns:
+            Number of relationships created or updated
+        """
+        if not self.driver:
+            if not self.connect():
+                return 0
+        
+        if not rows:
+            return 0
+        
+        # Collapse duplicate (from_id, to_id) pairs client-side, merging their properties
+        unique_rows = {}
+        for row in rows:
+            key = (row["from_id"], row["to_id"])
+            if key in unique_rows:
+                unique_rows[key].update(row.get("props") or {})
+            else:
+                unique_rows[key] = dict(row.get("props") or {})
+        if len(unique_rows) < len(rows):
+            self.logger.info(f"Dropped {len(rows) - len(unique_rows)} duplicate {rel_type} rows")
+        
+        # Only ship and SET properties when at least one row has any
+        if any(unique_rows.values()):
+            rows = [{"from_id": from_id, "to_id": to_id, "props": props}
+                    for (from_id, to_id), props in unique_rows.items()]
+            set_clause = "SET rel += r.props"
+        else:
+            rows = [{"from_id": from_id, "to_id": to_id} for from_id, to_id in unique_rows]
+            set_clause = ""
+        
+        # Both MATCHes resolve to unique index seeks through the id constraints
+        write = f"""
+        MATCH (a:{from_label} {{id: r.from_id}})
+        MATCH (b:{to_label} {{id: r.to_id}})
+        MERGE (a)-[rel:{rel_type}]->(b)
+        {set_clause}
+        """
         
         try:
-            with self.driver.session() as session:
+            if self._server_version_at_least(5, 21):
                 query = f"""
-                MATCH (a:{from_label} {{id: $from_id}})
-                MATCH (b:{to_label} {{id: $to_id}})
-                MERGE (a)-[r:{rel_type}]->(b)
-                SET r += $properties
-                RETURN type(r)
+                UNWIND $rows AS r
+                CALL {{
+                    WITH r
+                    {write}
+                    RETURN 1 AS created
+                }} IN CONCURRENT TRANSACTIONS OF {batch_size} ROWS
+                RETURN count(created) AS count
                 """
-                
-                result = session.run(query, from_id=from_id, to_id=to_id, properties=properties)
-                return result.single() is not None
+                with self.driver.session() as session:
+                    record = session.run(query, rows=rows).single()
+                    return record["count"] if record else 0
+            
+            if self._server_version_at_least(5, 11):
+                query = """
+                CALL apoc.periodic.iterate(
+                    'UNWIND $rows AS r RETURN r',
+                    $write,
+                    {batchSize: $batch_size, parallel: true, retries: 3, params: {rows: $rows}}
+                ) YIELD committedOperations, failedOperations, errorMessages
+                RETURN committedOperations, failedOperations, errorMessages
+                """
+                try:
+                    with self.driver.session() as session:
+                        record = session.run(query, rows=rows, write=write, batch_size=batch_size).single()
+                    if record and record["failedOperations"]:
+                        self.logger.error(f"Failed to create {record['failedOperations']} {rel_type} relationships: "
+                                          f"{record['errorMessages']}")
+                    return record["committedOperations"] if record else 0
+                except Exception as e:
+                    self.logger.warning(f"apoc.periodic.iterate unavailable, using serial batches: {e}")
+            
+            # Serial UNWIND batches
+            query = f"""
+            UNWIND $rows AS r
+            {write}
+            RETURN count(rel) AS count
+            """
+            count = 0
+            with self.driver.session() as session:
+                for start in range(0, len(rows), batch_size):
+                    record = session.run(query, rows=rows[start:start + batch_size]).single()
+                    count += record["count"] if record else 0
+            return count
                 
         except Exception as e:
-            self.logger.error(f"Error creating relationship: {e}")
-            return False
+            self.logger.error(f"Error creating {rel_type} relationships: {e}")
+            return 0
     
     def vector_search(self, label: str, vector: List[float], limit: int = 5) -> List[Dict[str, Any]]:
         """
@@ -2,12 +2,19 @@
 Script to process all nodes in the mock data and add embeddings to them.
 """
 
+import hashlib
 import json
+import logging
 import os
-import requests
+import ijson
+import orjson
 import sys
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from multiprocessing import Pool
+from typing import Dict, Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 from embedding_service import EmbeddingService
+from embedding_codec import (pack_node_embeddings, STORAGE_FLOAT16, STORAGE_FIELDS,
+                             EMBEDDING_SCALE_FIELD)
 from update_mock_data import update_mock_with_slack_data, update_mock_with_github_data
 
 # from backend.services.github_fetch import (
@@ -17,11 +24,29 @@ from update_mock_data import update_mock_with_slack_data, update_mock_with_githu
 #     fetch_and_save_all_github_data
 # )
 
+logger = logging.getLogger(__name__)
+
 # Using more flexible path resolution
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 INPUT_FILE = os.path.join(CURRENT_DIR, "mock.json")
 OUTPUT_FILE = os.path.join(CURRENT_DIR, "mock_with_embeddings.json")
 
+# Number of nodes embedded per batched model call
+EMBED_CHUNK_SIZE = 512
+
+# Number of chunks embedded concurrently
+EMBED_WORKERS = 4
+
+# Number of processes embedding whole collections in parallel. Each process
+# loads its own copy of the model, so this is off (0) unless set explicitly.
+EMBEDDING_PROCESSES = int(os.environ.get("EMBEDDING_PROCESSES", "0"))
+
+# Storage format for embeddings in the output file: "float16" or "int8"
+EMBEDDING_STORAGE = os.environ.get("EMBEDDING_STORAGE", STORAGE_FLOAT16)
+
+# Node property holding the hash of the text an embedding was computed from
+TEXT_HASH_FIELD = "textHash"
+
 NODE_TYPE_MAPPING = {
     "users": "User",
     "repositories": "Repository",
@@ -39,192 +64,308 @@ GITHUB_TO_SLACK_MAPPING = {
     "Yatsz": "hyunkim03"
 }
 
-def load_data(file_path: str) -> Dict[str, Any]:
-    """Load JSON data from file"""
-    print(f"Loading data from {file_path}")
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-    return data
+def iter_collections(file_path: str) -> Iterator[Tuple[str, Any]]:
+    """Stream the top-level collections of a JSON data file one at a time"""
+    print(f"Streaming data from {file_path}")
+    with open(file_path, 'rb') as f:
+        yield from ijson.kvitems(f, '', use_float=True)
+
+class SlackUser(NamedTuple):
+    """User fields needed to enrich a Slack message"""
+    userId: str
+    githubLogin: str
+
+def load_collection(file_path: str, collection_name: str) -> List[Dict[str, Any]]:
+    """Load a single top-level collection from a JSON data file"""
+    with open(file_path, 'rb') as f:
+        return list(ijson.items(f, f"{collection_name}.item", use_float=True))
 
-def save_data(data: Dict[str, Any], file_path: str):
-    """Save JSON data to file"""
+def save_data(data: Union[Dict[str, Any], Iterable[Tuple[str, Any]]], file_path: str):
+    """
+    Save JSON data to file.
+    
+    Accepts a dict or an iterable of (collection name, value) pairs. The
+    output is written incrementally, one list item per line, so a generator
+    of collections is never held in memory all at once and no single string
+    for the whole document is built.
+    """
     print(f"Saving data to {file_path}")
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=2)
+    items = data.items() if isinstance(data, dict) else data
+    with open(file_path, 'wb') as f:
+        f.write(b"{")
+        for index, (collection_name, value) in enumerate(items):
+            f.write(b",\n  " if index else b"\n  ")
+            f.write(orjson.dumps(collection_name) + b": ")
+            if not isinstance(value, list) or not value:
+                f.write(orjson.dumps(value))
+                continue
+            
+            f.write(b"[")
+            for item_index, item in enumerate(value):
+                f.write(b",\n    " if item_index else b"\n    ")
+                f.write(orjson.dumps(item))
+            f.write(b"\n  ]")
+        f.write(b"\n}\n")
 
-def add_slack_ids_to_users(users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Add hard-coded Slack IDs to specific users based on their GitHub login"""
-    updated_users = []
+def prepare_users(users: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, str], Dict[str, SlackUser]]:
+    """
+    Prepare users in a single pass.
+    
+    Adds the hard-coded Slack IDs to users in place and builds the user ID to
+    GitHub login and Slack ID to user mappings at the same time.
+    
+    Returns:
+        Tuple of (users, user_id_to_login, slack_id_to_user)
+    """
+    user_id_to_login = {}
+    slack_id_to_user = {}
     
     for user in users:
         github_login = user.get("githubLogin")
         if github_login in GITHUB_TO_SLACK_MAPPING:
             # Add or update the slackId field
             user["slackId"] = GITHUB_TO_SLACK_MAPPING[github_login]
-            print(f"Added slackId '{GITHUB_TO_SLACK_MAPPING[github_login]}' to user '{github_login}'")
+            logger.debug("Added slackId '%s' to user '%s'", user["slackId"], github_login)
         
-        updated_users.append(user)
-    
-    return updated_users
-
-def create_user_id_to_login_mapping(users: List[Dict[str, Any]]) -> Dict[str, str]:
-    """Create a mapping of user IDs to GitHub logins"""
-    user_id_to_login = {}
-    
-    for user in users:
         user_id = user.get("id")
-        github_login = user.get("githubLogin")
-        
         if user_id and github_login:
             user_id_to_login[user_id] = github_login
+            
+            slack_id = user.get("slackId")
+            if slack_id:
+                slack_id_to_user[slack_id] = SlackUser(user_id, github_login)
+                logger.debug("Mapped Slack ID '%s' to user '%s' with ID '%s'", slack_id, github_login, user_id)
     
     print(f"Created mapping for {len(user_id_to_login)} users")
-    return user_id_to_login
-
-def create_slack_id_to_user_mapping(users: List[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
-    """Create a mapping of Slack IDs to user information (ID and GitHub login)"""
-    slack_id_to_user = {}
-    
-    for user in users:
-        slack_id = user.get("slackId")
-        user_id = user.get("id")
-        github_login = user.get("githubLogin")
-        
-        if slack_id and user_id and github_login:
-            slack_id_to_user[slack_id] = {
-                "userId": user_id,
-                "githubLogin": github_login
-            }
-            print(f"Mapped Slack ID '{slack_id}' to user '{github_login}' with ID '{user_id}'")
-    
     print(f"Created Slack ID to user mapping for {len(slack_id_to_user)} users")
-    return slack_id_to_user
+    return users, user_id_to_login, slack_id_to_user
 
 def add_github_login_to_pull_requests(pull_requests: List[Dict[str, Any]], user_id_to_login: Dict[str, str]) -> List[Dict[str, Any]]:
-    """Add GitHub login to pull requests based on the author ID"""
-    updated_pull_requests = []
+    """Add GitHub login to pull requests (in place) based on the author ID"""
     login_added_count = 0
     
     for pr in pull_requests:
-        author_id = pr.get("authorId")
+        login = user_id_to_login.get(pr.get("authorId"))
         
-        if author_id and author_id in user_id_to_login:
+        if login is not None:
             # Add or update the authorLogin field
-            pr["authorLogin"] = user_id_to_login[author_id]
+            pr["authorLogin"] = login
             login_added_count += 1
-        
-        updated_pull_requests.append(pr)
     
     print(f"Added GitHub login to {login_added_count} pull requests")
-    return updated_pull_requests
+    return pull_requests
 
 def add_github_login_to_issues(issues: List[Dict[str, Any]], user_id_to_login: Dict[str, str]) -> List[Dict[str, Any]]:
-    """Add GitHub login to issues based on the author ID"""
-    updated_issues = []
+    """Add GitHub login to issues (in place) based on the author ID"""
     login_added_count = 0
     
     for issue in issues:
-        author_id = issue.get("authorId")
+        login = user_id_to_login.get(issue.get("authorId"))
         
-        if author_id and author_id in user_id_to_login:
+        if login is not None:
             # Add or update the authorLogin field
-            issue["authorLogin"] = user_id_to_login[author_id]
+            issue["authorLogin"] = login
             login_added_count += 1
-        
-        updated_issues.append(issue)
     
     print(f"Added GitHub login to {login_added_count} issues")
-    return updated_issues
+    return issues
 
-def enrich_slack_messages(messages: List[Dict[str, Any]], slack_id_to_user: Dict[str, Dict[str, str]]) -> List[Dict[str, Any]]:
-    """Enrich Slack messages with user ID and GitHub login"""
-    updated_messages = []
+def enrich_slack_messages(messages: List[Dict[str, Any]], slack_id_to_user: Dict[str, SlackUser]) -> List[Dict[str, Any]]:
+    """Enrich Slack messages (in place) with user ID and GitHub login"""
     enriched_count = 0
     skipped_count = 0
     
-    # Debug: print all available Slack IDs in our mapping
-    print(f"Available Slack IDs in mapping: {list(slack_id_to_user.keys())}")
+    logger.debug("Available Slack IDs in mapping: %s", list(slack_id_to_user.keys()))
     
     for msg in messages:
         slack_id = msg.get("slackId")
+        user = slack_id_to_user.get(slack_id)
         
-        if slack_id and slack_id in slack_id_to_user:
+        if user is not None:
             # Add user information to the message
-            msg["authorId"] = slack_id_to_user[slack_id]["userId"]
-            msg["authorLogin"] = slack_id_to_user[slack_id]["githubLogin"]
+            msg["authorId"] = user.userId
+            msg["authorLogin"] = user.githubLogin
             enriched_count += 1
-            print(f"Enriched message with Slack ID '{slack_id}', added authorId '{msg['authorId']}' and authorLogin '{msg['authorLogin']}'")
+            logger.debug("Enriched message with Slack ID '%s', added authorId '%s' and authorLogin '%s'",
+                         slack_id, msg["authorId"], msg["authorLogin"])
         else:
             # Debug why we couldn't enrich this message
             if not slack_id:
-                print(f"Message {msg.get('id', 'unknown')} has no slackId field")
-            elif slack_id not in slack_id_to_user:
-                print(f"Message has Slack ID '{slack_id}' but not found in our mapping")
+                logger.debug("Message %s has no slackId field", msg.get('id', 'unknown'))
+            else:
+                logger.debug("Message has Slack ID '%s' but not found in our mapping", slack_id)
             skipped_count += 1
-        
-        updated_messages.append(msg)
     
     print(f"Enriched {enriched_count} Slack messages with user information, skipped {skipped_count}")
-    return updated_messages
+    return messages
 
-def process_all_nodes(data: Dict[str, Any], embedding_service: EmbeddingService) -> Dict[str, Any]:
-    """Process all nodes in the data and add embeddings"""
-    result = {}
-    
-    # First pass to handle users and create the mapping
-    if "users" in data:
-        users = data["users"]
-        # Apply hard-coded Slack IDs to users
-        users = add_slack_ids_to_users(users)
-        result["users"] = users
-        
-        # Create user ID to GitHub login mapping
-        user_id_to_login = create_user_id_to_login_mapping(users)
-        
-        # Create Slack ID to user mapping
-        slack_id_to_user = create_slack_id_to_user_mapping(users)
-        
-        # Process pull requests with GitHub logins
-        if "pullRequests" in data:
-            pull_requests = data["pullRequests"]
-            pull_requests = add_github_login_to_pull_requests(pull_requests, user_id_to_login)
-            result["pullRequests"] = pull_requests
-        
-        # Process issues with GitHub logins
-        if "issues" in data:
-            issues = data["issues"]
-            issues = add_github_login_to_issues(issues, user_id_to_login)
-            result["issues"] = issues
-        
-        # Process Slack messages with user information
-        if "slackMessages" in data:
-            messages = data["slackMessages"]
-            messages = enrich_slack_messages(messages, slack_id_to_user)
-            result["slackMessages"] = messages
-    
-    # Process remaining collections
-    for collection_name, nodes in data.items():
-        if collection_name in ["users", "pullRequests", "issues", "slackMessages"]:
-            # Already processed
-            continue
-        elif collection_name in NODE_TYPE_MAPPING:
-            node_type = NODE_TYPE_MAPPING[collection_name]
-            print(f"Processing {len(nodes)} {node_type} nodes")
-            
-            processed_nodes = []
+def embed_chunk(nodes: List[Dict[str, Any]], texts: List[str], node_type: str, embedding_service: EmbeddingService):
+    """
+    Add packed embeddings to one chunk of nodes with a single batched call.
+    
+    If the batch fails, the nodes are embedded one by one so a single bad node
+    doesn't cost the whole chunk its embeddings.
+    """
+    try:
+        embeddings = embedding_service.embed_batch(texts)
+    except Exception as e:
+        print(f"Error embedding {len(nodes)} {node_type} nodes, falling back to one at a time: {e}")
+        for node in nodes:
+            try:
+                pack_node_embeddings([node], [embedding_service.create_embedding(node, node_type)], EMBEDDING_STORAGE)
+            except Exception as e:
+                print(f"Error embedding {node_type} node {node.get('id')}: {e}")
+        return
+    
+    # Cast the whole chunk at once, then pack each row
+    pack_node_embeddings(nodes, embeddings, EMBEDDING_STORAGE)
+
+def load_previous_embeddings(file_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the packed embeddings of a previous output file, keyed by node ID.
+    
+    Only nodes with a text hash and an embedding in the current storage
+    format are kept, so they can be reused when their text hasn't changed.
+    """
+    previous = {}
+    if not os.path.exists(file_path):
+        return previous
+    
+    packed_field = STORAGE_FIELDS.get(EMBEDDING_STORAGE, STORAGE_FIELDS[STORAGE_FLOAT16])
+    try:
+        for collection_name, nodes in iter_collections(file_path):
+            if collection_name not in NODE_TYPE_MAPPING or not isinstance(nodes, list):
+                continue
             for node in nodes:
-                try:
-                    node_with_embedding = embedding_service.add_embedding_to_node(node, node_type)
-                    processed_nodes.append(node_with_embedding)
-                except Exception as e:
-                    print(f"Error processing node {node.get('id')}: {e}")
-                    processed_nodes.append(node)
-            
-            result[collection_name] = processed_nodes
+                if node.get(TEXT_HASH_FIELD) and node.get(packed_field) is not None:
+                    previous[node["id"]] = {
+                        key: node[key] for key in (TEXT_HASH_FIELD, packed_field, EMBEDDING_SCALE_FIELD) if key in node
+                    }
+    except Exception as e:
+        print(f"Could not read previous embeddings from {file_path}: {e}")
+        return {}
+    
+    print(f"Loaded {len(previous)} previous embeddings for reuse")
+    return previous
+
+def embed_nodes(nodes: List[Dict[str, Any]], node_type: str, embedding_service: EmbeddingService,
+                previous_embeddings: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Add packed embeddings to all nodes of one type.
+    
+    Nodes whose text hash matches the previous run reuse that embedding. The
+    rest are split into chunks of EMBED_CHUNK_SIZE that are embedded on a
+    small thread pool, so tokenization and encoding of one chunk overlap with
+    model inference on another. Nodes are updated in place, so their order
+    is preserved.
+    """
+    all_texts = embedding_service.get_texts_for_embedding(nodes, node_type)
+    previous_embeddings = previous_embeddings or {}
+    
+    nodes_to_embed = []
+    texts = []
+    for node, text in zip(nodes, all_texts):
+        text_hash = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        previous = previous_embeddings.get(node.get("id"))
+        if previous is not None and previous[TEXT_HASH_FIELD] == text_hash:
+            node.update(previous)
         else:
-            result[collection_name] = nodes
+            node[TEXT_HASH_FIELD] = text_hash
+            nodes_to_embed.append(node)
+            texts.append(text)
+    
+    if len(nodes_to_embed) < len(nodes):
+        print(f"Reused {len(nodes) - len(nodes_to_embed)} unchanged {node_type} embeddings")
+    
+    with ThreadPoolExecutor(max_workers=EMBED_WORKERS) as executor:
+        futures = [
+            executor.submit(embed_chunk, nodes_to_embed[start:start + EMBED_CHUNK_SIZE],
+                            texts[start:start + EMBED_CHUNK_SIZE], node_type, embedding_service)
+            for start in range(0, len(nodes_to_embed), EMBED_CHUNK_SIZE)
+        ]
+        for future in as_completed(futures):
+            future.result()
+    
+    return nodes
+
+# Embedding service of a collection worker process
+_worker_embedding_service = None
+
+def _init_embedding_worker():
+    """Create the embedding service of a worker process"""
+    global _worker_embedding_service
+    _worker_embedding_service = EmbeddingService()
+
+def _embed_collection(task: Tuple[str, List[Dict[str, Any]], str, Dict[str, Dict[str, Any]]]) -> Tuple[str, List[Dict[str, Any]]]:
+    """Embed one collection in a worker process"""
+    collection_name, nodes, node_type, previous_embeddings = task
+    return collection_name, embed_nodes(nodes, node_type, _worker_embedding_service, previous_embeddings)
+
+def iter_processed_collections(input_file: str, embedding_service: EmbeddingService,
+                               previous_embeddings: Optional[Dict[str, Dict[str, Any]]] = None) -> Iterator[Tuple[str, Any]]:
+    """
+    Process the data file one collection at a time, yielding (name, nodes) pairs.
+    
+    Collections are streamed from the file, so the whole input document is
+    never parsed into memory at once; passed straight to save_data, each
+    collection can be released once written. Users are read up front because
+    the other collections are enriched from them.
     
-    return result
+    With EMBEDDING_PROCESSES > 1, collections that need embeddings are sent
+    to a process pool and yielded after the others, as they finish.
+    """
+    previous_embeddings = previous_embeddings or {}
+    pool = Pool(EMBEDDING_PROCESSES, initializer=_init_embedding_worker) if EMBEDDING_PROCESSES > 1 else None
+    pending = []
+    
+    try:
+        # First pass to handle users and create the mapping
+        # Apply hard-coded Slack IDs to users and build the user mappings
+        users, user_id_to_login, slack_id_to_user = prepare_users(load_collection(input_file, "users"))
+        
+        # Enrichment applied to each collection in its single pass over the nodes
+        enrichers = {
+            # Users were prepared above
+            "users": lambda nodes: users,
+            # Process pull requests with GitHub logins
+            "pullRequests": lambda nodes: add_github_login_to_pull_requests(nodes, user_id_to_login),
+            # Process issues with GitHub logins
+            "issues": lambda nodes: add_github_login_to_issues(nodes, user_id_to_login),
+            # Process Slack messages with user information
+            "slackMessages": lambda nodes: enrich_slack_messages(nodes, slack_id_to_user)
+        }
+        
+        for collection_name, nodes in iter_collections(input_file):
+            enrich = enrichers.get(collection_name)
+            if enrich is not None:
+                yield collection_name, enrich(nodes)
+            elif collection_name in NODE_TYPE_MAPPING:
+                node_type = NODE_TYPE_MAPPING[collection_name]
+                print(f"Processing {len(nodes)} {node_type} nodes")
+                
+                if pool is None:
+                    yield collection_name, embed_nodes(nodes, node_type, embedding_service, previous_embeddings)
+                else:
+                    # Only ship the previous embeddings this collection can use
+                    collection_previous = {node["id"]: previous_embeddings[node["id"]]
+                                           for node in nodes if node.get("id") in previous_embeddings}
+                    pending.append(pool.apply_async(_embed_collection,
+                                                    ((collection_name, nodes, node_type, collection_previous),)))
+            else:
+                yield collection_name, nodes
+        
+        for result in pending:
+            yield result.get()
+    finally:
+        # All results have been collected (or processing failed), so stop the workers
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+def process_all_nodes(input_file: str, embedding_service: EmbeddingService,
+                      previous_embeddings: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Process all nodes in the data file and add embeddings"""
+    return dict(iter_processed_collections(input_file, embedding_service, previous_embeddings))
 
 def main():
     # First fetch the latest GitHub data from the API
@@ -254,16 +395,18 @@ def main():
         print(f"Error: Input file {INPUT_FILE} not found")
         return
     
-    data = load_data(INPUT_FILE)
-    
     embedding_service = EmbeddingService()
     
-    processed_data = process_all_nodes(data, embedding_service)
+    # Read the previous output before it is overwritten, to reuse unchanged embeddings
+    previous_embeddings = load_previous_embeddings(OUTPUT_FILE)
     
-    # Ensure the directory exists
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    # Ensure the directory exists (a bare file name has no directory to create)
+    output_dir = os.path.dirname(OUTPUT_FILE)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
     
-    save_data(processed_data, OUTPUT_FILE)
+    # Write each collection as soon as it has been processed
+    save_data(iter_processed_collections(INPUT_FILE, embedding_service, previous_embeddings), OUTPUT_FILE)
     
     print(f"Successfully processed data and saved to {OUTPUT_FILE}")
 
@@ -1,12 +1,20 @@
 from neo4j import GraphDatabase
 from neo4j_graphrag.retrievers import VectorRetriever
 from neo4j_graphrag.llm import LLMInterface, LLMResponse
-from neo4j_graphrag.generation import GraphRAG
+from neo4j_graphrag.generation import RagTemplate
 from neo4j_graphrag.embeddings.sentence_transformers import SentenceTransformerEmbeddings
-from neo4j_graphrag.indexes import create_vector_index
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import httpx
+import asyncio
+import hashlib
+import numpy as np
+import orjson
 import os
+import sqlite3
+import threading
+import torch
+from collections import Counter, OrderedDict
 import sys
 import re
 from dotenv import load_dotenv
@@ -14,6 +22,25 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+AS1_API_URL = "https://api.asi1.ai/v1/chat/completions"
+
+# Number of attempts for an async LLM request before giving up
+AS1_MAX_ATTEMPTS = 5
+
+# Maximum number of messages sent to the LLM, including the system prompt.
+# Older history is dropped first.
+MAX_CONTEXT_MESSAGES = 32
+
+# Headers sent with every LLM request (the Authorization header is added per instance)
+AS1_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json'
+}
+
+# Shared HTTP session so LLM requests reuse pooled keep-alive connections
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
 # Custom As1 LLM implementation that follows LLMInterface
 class As1LLM(LLMInterface):
     def __init__(self, model_name="asi1-mini", model_params=None, **kwargs):
@@ -22,12 +49,11 @@ class As1LLM(LLMInterface):
         self.api_key = os.environ.get("AS1_API_KEY")
         if not self.api_key:
             raise ValueError("AS1_API_KEY environment variable not set")
+        self._headers = {**AS1_HEADERS, 'Authorization': f'Bearer {self.api_key}'}
+        self._session = _session
         
-    def invoke(self, input, message_history=None, system_instruction=None):
-        url = "https://api.asi1.ai/v1/chat/completions"
-        
-        messages = []
-        
+    def _build_body(self, input, message_history=None, system_instruction=None):
+        """Build the serialized JSON body of a chat completion request"""
         # Add system message if provided, otherwise use default formatting instruction
         if system_instruction is None:
             system_instruction = """
@@ -48,18 +74,14 @@ class As1LLM(LLMInterface):
             Your tone should be professional, clear, and factual.
             """
         
-        messages.append({
+        messages = [{
             "role": "system",
             "content": system_instruction
-        })
+        }]
         
         # Add message history if provided
         if message_history:
-            for msg in message_history:
-                messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
+            messages.extend({"role": msg.role, "content": msg.content} for msg in message_history)
         
         # Add the current input
         messages.append({
@@ -67,30 +89,133 @@ class As1LLM(LLMInterface):
             "content": input
         })
         
-        payload = json.dumps({
+        # Keep the system prompt and the most recent messages
+        if len(messages) > MAX_CONTEXT_MESSAGES:
+            messages = [messages[0], *messages[-(MAX_CONTEXT_MESSAGES - 1):]]
+        
+        return orjson.dumps({
             "model": self.model_name,
             "messages": messages,
             **self.model_params,
             "stream": False
         })
-        
-        headers = {
-            'Content-Type': 'application/json',
-            'Accept': 'application/json',
-            'Authorization': f'Bearer {self.api_key}'
-        }
-        
-        response = requests.post(url, headers=headers, data=payload)
-        response_data = response.json()
+    
+    @staticmethod
+    def _parse_response(body):
+        response_data = orjson.loads(body)
         
         # Extract the content from the response
         content = response_data.get("choices", [{}])[0].get("message", {}).get("content", "")
         
         return LLMResponse(content=content)
+        
+    def invoke(self, input, message_history=None, system_instruction=None):
+        body = self._build_body(input, message_history, system_instruction)
+        
+        response = self._session.post(AS1_API_URL, headers=self._headers, data=body)
+        return self._parse_response(response.content)
 
     async def ainvoke(self, input, message_history=None, system_instruction=None):
-        return self.invoke(input, message_history, system_instruction)  # Synchronous fallback for async calls
+        body = self._build_body(input, message_history, system_instruction)
+        
+        # The client is scoped to this call: an instance-level one would stay bound
+        # to the first event loop and break later asyncio.run() calls
+        async with httpx.AsyncClient(timeout=60) as client:
+            # Retry transport errors, rate limiting and server errors with exponential
+            # backoff; other error statuses (bad request, auth) fail straight away
+            for attempt in range(AS1_MAX_ATTEMPTS):
+                last_attempt = attempt == AS1_MAX_ATTEMPTS - 1
+                try:
+                    response = await client.post(AS1_API_URL, headers=self._headers, content=body)
+                except httpx.TransportError:
+                    if last_attempt:
+                        raise
+                else:
+                    if last_attempt or (response.status_code != 429 and response.status_code < 500):
+                        response.raise_for_status()
+                        return self._parse_response(response.content)
+                await asyncio.sleep(2 ** attempt)
+
+
+# Search term mappings used to pick a node type for a query
+NODE_TYPE_KEYWORDS = {
+    "PullRequest": frozenset(("pr", "pull request", "code change", "merge", "branch", "commit", "git", "repository", "repo", "developer", "contribution", "feature", "oauth", "implementation")),
+    "Issue": frozenset(("issue", "bug", "ticket", "problem", "task", "feature request", "enhancement", "error", "defect", "tracker")),
+    "Message": frozenset(("chat", "slack", "message", "conversation", "discussion", "said", "mentioned", "talk", "channel", "communication", "discuss")),
+    "TextChunk": frozenset() # Fallback, no specific keywords
+}
+
+# Phrases that select a node type outright, checked in this order
+PRIORITY_PHRASES = (
+    ("Issue", "issue_vector_idx", ("who reported", "issue reporter", "bug report", "filed an issue"), "Query specifically asks about issues"),
+    ("PullRequest", "pullrequest_vector_idx", ("who wrote", "who implemented", "who coded", "who developed", "oauth", "integration", "author"), "Query asks about code authorship or implementation"),
+    ("Message", "message_vector_idx", ("who said", "who mentioned", "who discussed", "who talked", "conversation", "chat", "slack"), "Query asks about discussions or conversations")
+)
+
+# Fallback order of node types when no keyword matches
+FALLBACK_NODE_TYPES = ("TextChunk", "PullRequest", "Issue", "Message")
+
+# Vector index name of each node type
+VECTOR_INDEX_NAMES = {node_type: f"{node_type.lower()}_vector_idx" for node_type in NODE_TYPE_KEYWORDS}
+
+def _build_keyword_scanner():
+    """
+    Build a single regex that finds every keyword in one pass.
+    
+    The pattern is a lookahead over all keywords, longest first, so it matches
+    at every position of the query and reports the longest keyword starting
+    there. Any shorter keyword starting at the same position is a prefix of
+    that one, so each keyword maps to the tags of itself and all of its
+    prefixes; the result is the same set of hits as testing each keyword as a
+    substring.
+    
+    Returns:
+        Tuple of (compiled pattern, dict of keyword -> set of (keyword, node_type) hits)
+    """
+    keyword_types = {}
+    for node_type, keywords in NODE_TYPE_KEYWORDS.items():
+        for keyword in keywords:
+            keyword_types.setdefault(keyword, set()).add(node_type)
+    
+    keywords = sorted(keyword_types, key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in keywords) + "))")
+    
+    # Hits of each keyword, including every keyword that is a prefix of it
+    scanner_tags = {
+        keyword: {(prefix, node_type) for prefix in keywords if keyword.startswith(prefix) for node_type in keyword_types[prefix]}
+        for keyword in keywords
+    }
+    return pattern, scanner_tags
+
+KEYWORD_SCANNER, KEYWORD_SCANNER_TAGS = _build_keyword_scanner()
+
+# All priority phrases in one pattern, with a named group per node type. The
+# lookahead lets matches overlap, so a phrase inside another is still found.
+PRIORITY_SCANNER = re.compile(
+    "(?=" + "|".join(
+        f"(?P<{node_type}>" + "|".join(re.escape(phrase) for phrase in phrases) + ")"
+        for node_type, _, phrases, _ in PRIORITY_PHRASES
+    ) + ")"
+)
 
+def _scan_query(query_text):
+    """
+    Scan a query for keywords and priority phrases.
+    
+    Returns:
+        Tuple of (set of node types with a priority phrase hit, Counter of keyword hits per node type)
+    """
+    query = query_text.lower()
+    
+    # The named group of each priority match is the node type it selects
+    priority_hits = {match.lastgroup for match in PRIORITY_SCANNER.finditer(query)}
+    
+    # Collect the distinct keywords the query contains
+    keyword_hits = set()
+    for match in KEYWORD_SCANNER.finditer(query):
+        keyword_hits.update(KEYWORD_SCANNER_TAGS[match.group(1)])
+    
+    return priority_hits, Counter(node_type for _, node_type in keyword_hits)
 
 def determine_best_node_type(query_text, available_node_types):
     """
@@ -103,59 +228,72 @@ def determine_best_node_type(query_text, available_node_types):
     Returns:
         Tuple of (node_label, index_name, reason)
     """
-    query = query_text.lower()
-    
-    # Define search term mappings
-    node_type_keywords = {
-        "PullRequest": ["pr", "pull request", "code change", "merge", "branch", "commit", "git", "repository", "repo", "developer", "contribution", "feature", "oauth", "implementation"],
-        "Issue": ["issue", "bug", "ticket", "problem", "task", "feature request", "enhancement", "error", "defect", "tracker"],
-        "Message": ["chat", "slack", "message", "conversation", "discussion", "said", "mentioned", "talk", "channel", "communication", "discuss"],
-        "TextChunk": [] # Fallback, no specific keywords
-    }
-    
+    priority_hits, scores = _scan_query(query_text)
+    return _select_node_type(priority_hits, scores, available_node_types)
+
+def _select_node_type(priority_hits, scores, available_node_types):
     # Check for highest priority node types first if they have embeddings
-    if "Issue" in available_node_types and available_node_types["Issue"] > 0:
-        if any(term in query for term in ["who reported", "issue reporter", "bug report", "filed an issue"]):
-            return "Issue", f"issue_vector_idx", "Query specifically asks about issues"
-    
-    if "PullRequest" in available_node_types and available_node_types["PullRequest"] > 0:
-        if any(term in query for term in ["who wrote", "who implemented", "who coded", "who developed", "oauth", "integration", "author"]):
-            return "PullRequest", f"pullrequest_vector_idx", "Query asks about code authorship or implementation"
-    
-    if "Message" in available_node_types and available_node_types["Message"] > 0:
-        if any(term in query for term in ["who said", "who mentioned", "who discussed", "who talked", "conversation", "chat", "slack"]):
-            return "Message", f"message_vector_idx", "Query asks about discussions or conversations"
-            
-    # Count keyword matches for each node type
-    scores = {node_type: 0 for node_type in available_node_types}
-    
-    for node_type, keywords in node_type_keywords.items():
-        if node_type in available_node_types and available_node_types[node_type] > 0:
-            for keyword in keywords:
-                if keyword in query:
-                    scores[node_type] += 1
+    for node_type, index_name, _, reason in PRIORITY_PHRASES:
+        if node_type in priority_hits and available_node_types.get(node_type, 0) > 0:
+            return node_type, index_name, reason
     
     # Find the node type with the highest score
     max_score = -1
     best_node_type = None
     
-    for node_type, score in scores.items():
-        if score > max_score and available_node_types[node_type] > 0:
+    for node_type, count in available_node_types.items():
+        score = scores[node_type]
+        if score > max_score and count > 0:
             max_score = score
             best_node_type = node_type
     
     # If we have a clear winner with matches
     if best_node_type and max_score > 0:
-        return best_node_type, f"{best_node_type.lower()}_vector_idx", f"Query contains {max_score} keywords related to {best_node_type}"
+        return best_node_type, VECTOR_INDEX_NAMES.get(best_node_type, f"{best_node_type.lower()}_vector_idx"), f"Query contains {max_score} keywords related to {best_node_type}"
     
     # If no clear winner by keywords, prioritize by data availability and generality
-    for node_type in ["TextChunk", "PullRequest", "Issue", "Message"]:
-        if node_type in available_node_types and available_node_types[node_type] > 0:
-            return node_type, f"{node_type.lower()}_vector_idx", f"Fallback to {node_type} based on available data"
+    for node_type in FALLBACK_NODE_TYPES:
+        if available_node_types.get(node_type, 0) > 0:
+            return node_type, VECTOR_INDEX_NAMES[node_type], f"Fallback to {node_type} based on available data"
     
     # If nothing else, use TextChunk as absolute fallback
     return "TextChunk", "textchunk_vector_idx", "Default fallback"
 
+# Keyword score gap within which the top two node types count as a tie
+AMBIGUOUS_SCORE_MARGIN = 1
+
+def determine_candidate_node_types(query_text, available_node_types, max_candidates=2):
+    """
+    Like determine_best_node_type, but returns several node types for ambiguous queries.
+    
+    When no priority phrase decides the query and the keyword scores of the
+    best node types are within AMBIGUOUS_SCORE_MARGIN of each other, up to
+    max_candidates of them are returned so their indexes can all be searched.
+    
+    Returns:
+        List of (node_label, index_name, reason) tuples, best first
+    """
+    priority_hits, scores = _scan_query(query_text)
+    best = _select_node_type(priority_hits, scores, available_node_types)
+    
+    if any(available_node_types.get(node_type, 0) > 0 for node_type in priority_hits):
+        return [best]
+    
+    # Node types with data and keyword matches, highest score first (stable for ties)
+    ranked = sorted(
+        (node_type for node_type, count in available_node_types.items() if count > 0 and scores[node_type] > 0),
+        key=lambda node_type: scores[node_type],
+        reverse=True
+    )
+    if len(ranked) < 2 or scores[ranked[0]] - scores[ranked[1]] > AMBIGUOUS_SCORE_MARGIN:
+        return [best]
+    
+    return [
+        (node_type, VECTOR_INDEX_NAMES.get(node_type, f"{node_type.lower()}_vector_idx"),
+         f"Query contains {scores[node_type]} keywords related to {node_type} (ambiguous with other node types)")
+        for node_type in ranked[:max_candidates]
+    ]
+
 
 # 1. Neo4j driver
 URI = "neo4j://localhost:7687"
@@ -164,9 +302,16 @@ AUTH = ("neo4j", "password")
 EMBEDDING_PROPERTY = "embedding"  # Property where embeddings are stored
 EMBEDDING_DIMENSION = 384  # Dimension for all-MiniLM-L6-v2
 
+# Node types that can carry embeddings, in fallback order
+EMBEDDED_NODE_LABELS = list(FALLBACK_NODE_TYPES)
+
 # Connect to Neo4j database
 driver = GraphDatabase.driver(URI, auth=AUTH)
 
+# Names of indexes known to exist, filled from SHOW INDEXES at startup and
+# by ensure_vector_index, so later checks don't need a round-trip
+_known_indexes = set()
+
 # Check Neo4j version and get available node types with embeddings
 available_node_types = {}
 try:
@@ -179,20 +324,25 @@ try:
         
         # List all existing indexes
         print("Checking for existing indexes...")
-        result = session.run("SHOW INDEXES")
-        indexes = [dict(record) for record in result]
-        if indexes:
-            print("Existing indexes:")
-            for idx in indexes:
-                print(f"  - {idx.get('name', 'unknown')} (type: {idx.get('type', 'unknown')}, labels: {idx.get('labelsOrTypes', [])})")
-        else:
+        # Stream the records, keeping only the index names
+        for record in session.run("SHOW INDEXES YIELD name, type, labelsOrTypes"):
+            if not _known_indexes:
+                print("Existing indexes:")
+            _known_indexes.add(record["name"])
+            print(f"  - {record['name']} (type: {record['type']}, labels: {record['labelsOrTypes']})")
+        if not _known_indexes:
             print("No indexes found in the database.")
         
-        # Check for nodes with embeddings for each important node type
-        for node_label in ["TextChunk", "PullRequest", "Issue", "Message"]:
-            result = session.run(f"MATCH (n:{node_label}) WHERE n.{EMBEDDING_PROPERTY} IS NOT NULL RETURN count(n) as count")
-            record = result.single()
-            count = record["count"] if record and record["count"] > 0 else 0
+        # Check for nodes with embeddings for each important node type in a single round-trip.
+        # Labels can't be parameters, so the per-label counts are joined with UNION ALL,
+        # which keeps a label scan for each of them.
+        count_query = "\nUNION ALL\n".join(
+            f"MATCH (n:{node_label}) WHERE n.{EMBEDDING_PROPERTY} IS NOT NULL RETURN '{node_label}' AS label, count(n) AS count"
+            for node_label in EMBEDDED_NODE_LABELS
+        )
+        counts = {record["label"]: record["count"] for record in session.run(count_query)}
+        for node_label in EMBEDDED_NODE_LABELS:
+            count = counts.get(node_label, 0)
             available_node_types[node_label] = count
             if count > 0:
                 print(f"Found {count} {node_label} nodes with embeddings.")
@@ -204,50 +354,159 @@ except Exception as e:
 
 # Function to ensure a vector index exists for a given node type
 def ensure_vector_index(node_label, index_name):
+    # Only go to Neo4j for indexes not seen at startup or ensured before
+    if index_name in _known_indexes:
+        return True
+    
     print(f"\nEnsuring vector index '{index_name}' exists for {node_label} nodes...")
     try:
-        # Check if index already exists
-        with driver.session() as session:
-            result = session.run(f"SHOW INDEXES WHERE name = '{index_name}'")
-            if result.single():
-                print(f"Vector index '{index_name}' already exists.")
-                return True
-                
-        # Create the index if it doesn't exist
-        create_vector_index(
-            driver,
-            index_name,
-            label=node_label,
-            embedding_property=EMBEDDING_PROPERTY,
-            dimensions=EMBEDDING_DIMENSION,
-            similarity_fn="cosine",
-            fail_if_exists=False
-        )
-        print(f"Vector index '{index_name}' created successfully.")
+        # IF NOT EXISTS makes this idempotent, so no existence probe is needed
+        cypher = f"""
+        CREATE VECTOR INDEX {index_name} IF NOT EXISTS
+        FOR (n:{node_label})
+        ON (n.{EMBEDDING_PROPERTY})
+        OPTIONS {{indexConfig: {{`vector.dimensions`: {EMBEDDING_DIMENSION}, `vector.similarity_function`: 'cosine'}}}}
+        """
+        driver.execute_query(cypher)
+        print(f"Vector index '{index_name}' is in place.")
+        _known_indexes.add(index_name)
         return True
     except Exception as e:
-        print(f"Error creating vector index using neo4j_graphrag: {e}")
-        print("\nTrying direct Cypher approach instead...")
+        print(f"Error creating vector index '{index_name}': {e}")
+        return False
+
+# On-disk cache of query embeddings, shared across processes and restarts.
+# Kept in the user's cache directory, not in the source tree.
+EMBED_CACHE_PATH = os.environ.get("EMBED_CACHE_PATH", os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "devatlas", "embed_cache.sqlite"))
+
+# Number of query embeddings kept in memory
+EMBED_CACHE_SIZE = 4096
+
+# Quantize the query embedding model's linear layers to int8 for faster CPU
+# inference. Off by default: document embeddings are computed with the float32
+# model, and int8 query vectors only approximate it, so enable this only after
+# checking retrieval quality on your data.
+EMBED_QUANTIZE = os.environ.get("EMBED_QUANTIZE", "0") == "1"
+
+class CachedEmbedder(SentenceTransformerEmbeddings):
+    """
+    Sentence transformer embedder that caches query embeddings.
+    
+    Embeddings are keyed by the SHA-256 of the model name, the quantization
+    setting and the query text, and kept in an in-memory LRU backed by a
+    SQLite file, so repeated queries (also across restarts) skip the model
+    forward pass. Vectors are stored as float32 bytes.
+    
+    With quantize=True the model's linear layers are dynamically quantized to
+    int8. The resulting vectors differ slightly from those of the float32
+    model used for the stored document embeddings.
+    """
+    
+    def __init__(self, model="all-MiniLM-L6-v2", *args, cache_path=EMBED_CACHE_PATH, cache_size=EMBED_CACHE_SIZE,
+                 quantize=EMBED_QUANTIZE, **kwargs):
+        super().__init__(model, *args, **kwargs)
+        # Vectors of different models (or of the quantized model) never share cache entries
+        self._key_prefix = f"{model}\0{'int8' if quantize else 'float32'}\0".encode("utf-8")
+        if quantize:
+            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        self._db = sqlite3.connect(cache_path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+        self._db.commit()
+    
+    def _remember(self, key, vector):
+        self._cache[key] = vector
+        self._cache.move_to_end(key)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+    
+    def _encode(self, text):
+        """Run the model on a single text, returning a unit-length float32 vector"""
+        vector = self.model.encode([text], normalize_embeddings=True)[0]
+        return np.asarray(vector, dtype=np.float32).tolist()
+    
+    def embed_query(self, text):
+        key = hashlib.sha256(self._key_prefix + text.encode("utf-8")).digest()
         
-        try:
-            with driver.session() as session:
-                # Try creating the index with direct Cypher for compatibility
-                cypher = f"""
-                CREATE VECTOR INDEX {index_name} IF NOT EXISTS
-                FOR (n:{node_label})
-                ON (n.{EMBEDDING_PROPERTY})
-                OPTIONS {{indexConfig: {{`vector.dimensions`: {EMBEDDING_DIMENSION}, `vector.similarity_function`: 'cosine'}}}}
-                """
-                session.run(cypher)
-                print(f"Vector index '{index_name}' created with direct Cypher.")
-                return True
-        except Exception as e2:
-            print(f"Error creating index with direct Cypher: {e2}")
-            return False
-
-# Create embedder using SentenceTransformerEmbeddings from the library
-print("\nInitializing sentence transformer embedder...")
-embedder = SentenceTransformerEmbeddings(model="all-MiniLM-L6-v2")
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                return vector
+            
+            row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                vector = np.frombuffer(row[0], dtype=np.float32).tolist()
+                self._remember(key, vector)
+                return vector
+        
+        vector = self._encode(text)
+        
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                             (key, np.asarray(vector, dtype=np.float32).tobytes()))
+            self._db.commit()
+            self._remember(key, vector)
+        return vector
+
+# Embedder, created in the background so model loading stays off the import and request path
+embedder = None
+
+def _warm_embedder():
+    global embedder
+    print("\nInitializing sentence transformer embedder...")
+    embedder = CachedEmbedder(model="all-MiniLM-L6-v2")
+    # Run one forward pass (bypassing the cache) so the first query doesn't pay for lazy initialization
+    embedder._encode("warmup")
+    print("Sentence transformer embedder ready.")
+
+_warm_thread = threading.Thread(target=_warm_embedder, daemon=True)
+_warm_thread.start()
+
+def get_embedder():
+    """Return the embedder, waiting for the background warm-up to finish"""
+    _warm_thread.join()
+    if embedder is None:
+        raise RuntimeError("Sentence transformer embedder failed to initialize")
+    return embedder
+
+# Shared LLM and one retriever per vector index, built on first use
+_llm = None
+_retriever_cache = {}
+
+# Prompt template of the RAG answers (the same one GraphRAG uses by default)
+RAG_TEMPLATE = RagTemplate()
+
+def get_llm():
+    """Return the shared As1 LLM, creating it on first use"""
+    global _llm
+    if _llm is None:
+        print("Initializing As1 LLM...")
+        _llm = As1LLM(model_name="asi1-mini", model_params={"temperature": 0, "max_tokens": 0})
+    return _llm
+
+def get_retriever(index_name):
+    """Return the vector retriever for an index, creating it on first use"""
+    retriever = _retriever_cache.get(index_name)
+    if retriever is None:
+        print(f"Initializing vector retriever with index '{index_name}'...")
+        retriever = VectorRetriever(driver, index_name, get_embedder())
+        _retriever_cache[index_name] = retriever
+    return retriever
+
+def build_rag_prompt(query_text, items):
+    """
+    Build the LLM prompt for a query from retrieved items, as GraphRAG.search does.
+    
+    Returns:
+        Tuple of (prompt, context)
+    """
+    context = "\n".join(item.content for item in items)
+    return RAG_TEMPLATE.format(query_text=query_text, context=context, examples=""), context
 
 # Query the graph function
 def query_rag(query_text, top_k=500, capture_debug=None):
@@ -286,35 +545,22 @@ def query_rag(query_text, top_k=500, capture_debug=None):
             return f"Error: Unable to create necessary vector indexes.", node_label, "Failed to create index"
     
     try:
-        # Initialize the retriever with the selected index name
-        print(f"Initializing vector retriever with index '{index_name}'...")
-        retriever = VectorRetriever(driver, index_name, embedder)
-        
-        # Initialize As1 LLM
-        print("Initializing As1 LLM...")
-        llm = As1LLM(model_name="asi1-mini", model_params={"temperature": 0, "max_tokens": 0})
-        
-        # Initialize the RAG pipeline
-        print("Creating RAG pipeline...")
-        rag = GraphRAG(retriever=retriever, llm=llm)
+        # Embed the query once (through the embedding cache) and search by vector,
+        # so the retriever doesn't run the model again
+        query_vector = get_embedder().embed_query(query_text)
         
         # Execute the query
         print(f"Executing query...")
-        response = rag.search(query_text=query_text, retriever_config={"top_k": top_k})
+        result = get_retriever(index_name).search(query_vector=query_vector, top_k=top_k)
+        prompt, context = build_rag_prompt(query_text, result.items)
+        response = get_llm().invoke(prompt, system_instruction=RAG_TEMPLATE.system_instructions)
         
         # Capture retrieved context if debug is enabled
         if capture_debug is not None:
-            capture_debug["retrieved_docs_count"] = top_k
-            # Try to extract the contexts used
-            try:
-                if hasattr(response, "context") and response.context:
-                    capture_debug["contexts"] = response.context
-                elif hasattr(response, "_context") and response._context:
-                    capture_debug["contexts"] = response._context
-            except Exception as e:
-                capture_debug["context_extraction_error"] = str(e)
+            capture_debug["retrieved_docs_count"] = len(result.items)
+            capture_debug["contexts"] = context
         
-        return response.answer, node_label, reason
+        return response.content, node_label, reason
     except Exception as e:
         error_message = f"Error in RAG pipeline: {e}"
         print(error_message)
@@ -325,6 +571,84 @@ def query_rag(query_text, top_k=500, capture_debug=None):
         return f"Error querying the knowledge graph: {str(e)}", node_label, "Error during query"
 
 
+async def _retrieve_async(index_name, query_vector, top_k):
+    """Search one vector index without blocking the event loop"""
+    return await asyncio.to_thread(get_retriever(index_name).search, query_vector=query_vector, top_k=top_k)
+
+async def query_rag_multi(query_text, top_k=500, capture_debug=None):
+    """
+    Query the graph using RAG over one or more vector indexes.
+    
+    For ambiguous queries (see determine_candidate_node_types) the indexes of
+    the top candidate node types are searched concurrently, the results are
+    merged and de-duplicated by node, and a single LLM call answers over the
+    union. Otherwise this behaves like query_rag.
+    
+    Args:
+        query_text (str): The user's query
+        top_k (int): Maximum number of relevant documents to retrieve per index
+        capture_debug (dict, optional): Dictionary to capture debug information
+        
+    Returns:
+        tuple: (answer, node_types, reason) - The answer text, the node types used joined with '+', and the reasons for selection
+    """
+    candidates = determine_candidate_node_types(query_text, available_node_types)
+    print(f"\nAnalyzing query: '{query_text}'")
+    for node_label, index_name, reason in candidates:
+        print(f"Selected {node_label} nodes with '{index_name}' index ({reason})")
+    
+    # Keep the candidates whose index exists, falling back to TextChunk if none do
+    candidates = [candidate for candidate in candidates if ensure_vector_index(candidate[0], candidate[1])]
+    if not candidates:
+        print("Failed to create vector indexes. Falling back to TextChunk.")
+        if not ensure_vector_index("TextChunk", "textchunk_vector_idx"):
+            print("Failed to create fallback index. Cannot continue.")
+            return f"Error: Unable to create necessary vector indexes.", "TextChunk", "Failed to create index"
+        candidates = [("TextChunk", "textchunk_vector_idx", "Fallback after index creation failed")]
+    
+    node_types = "+".join(candidate[0] for candidate in candidates)
+    reason = "; ".join(candidate[2] for candidate in candidates)
+    
+    if capture_debug is not None:
+        capture_debug["query"] = query_text
+        capture_debug["selected_node_type"] = node_types
+        capture_debug["index_name"] = [candidate[1] for candidate in candidates]
+        capture_debug["selection_reason"] = reason
+        capture_debug["available_node_types"] = available_node_types
+    
+    try:
+        # Embed the query once, then search all candidate indexes at the same time
+        query_vector = await asyncio.to_thread(lambda: get_embedder().embed_query(query_text))
+        print(f"Executing query against {len(candidates)} index(es)...")
+        results = await asyncio.gather(*[_retrieve_async(index_name, query_vector, top_k) for _, index_name, _ in candidates])
+        
+        # Merge the retrieved items, keeping the first occurrence of each node
+        seen = set()
+        items = []
+        for result in results:
+            for item in result.items:
+                key = (item.metadata or {}).get("id") or item.content
+                if key not in seen:
+                    seen.add(key)
+                    items.append(item)
+        
+        prompt, context = build_rag_prompt(query_text, items)
+        response = await get_llm().ainvoke(prompt, system_instruction=RAG_TEMPLATE.system_instructions)
+        
+        if capture_debug is not None:
+            capture_debug["retrieved_docs_count"] = len(items)
+            capture_debug["contexts"] = context
+        
+        return response.content, node_types, reason
+    except Exception as e:
+        print(f"Error in RAG pipeline: {e}")
+        
+        if capture_debug is not None:
+            capture_debug["error"] = str(e)
+            
+        return f"Error querying the knowledge graph: {str(e)}", node_types, "Error during query"
+
+
 # Process the query if running as a script directly
 if __name__ == "__main__":
     # Parse command-line arguments
@@ -344,21 +668,21 @@ if __name__ == "__main__":
                 if not user_query:
                     continue
                     
-                answer, node_type, reason = query_rag(user_query)
+                answer, node_type, reason = asyncio.run(query_rag_multi(user_query))
                 print(f"\nNode type used: {node_type}")
                 print(f"Reason: {reason}")
                 print(f"\nAnswer: {answer}")
         else:
             # Use the first argument as a query
             query_text = " ".join(sys.argv[1:])
-            answer, node_type, reason = query_rag(query_text)
+            answer, node_type, reason = asyncio.run(query_rag_multi(query_text))
             print(f"\nNode type used: {node_type}")
             print(f"Reason: {reason}")
             print(f"\nAnswer: {answer}")
     else:
         # Default query if no arguments provided
         query_text = "Who wrote the OAUTH Integration?"
-        answer, node_type, reason = query_rag(query_text)
+        answer, node_type, reason = asyncio.run(query_rag_multi(query_text))
         print(f"\nNode type used: {node_type}")
         print(f"Reason: {reason}")
         print(f"\nAnswer: {answer}")
\ No newline at end of file
@@ -1,75 +1,317 @@
-import json
+import hashlib
+import ijson
+import mmap
+import orjson
 import os
+import shutil
 import sys
 
-def update_mock_with_slack_data():
+# Pretty-print written JSON files (for development); compact output otherwise
+PRETTY_JSON = bool(os.environ.get('DEVATLAS_PRETTY_JSON'))
+JSON_DUMP_OPTIONS = orjson.OPT_INDENT_2 if PRETTY_JSON else 0
+
+# Files larger than this are parsed straight from a memory map
+MMAP_THRESHOLD_BYTES = 1024 * 1024
+
+def load_json(file_path):
     """
-    Updates the mock.json file by replacing only the Slack data
-    (slackChannels and slackMessages) with data from slack_entities.json
-    while preserving all GitHub-related data.
+    Read and parse a JSON file.
+    
+    Large files are memory-mapped and parsed in place, skipping the copy
+    into a bytes object that read() would make.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= MMAP_THRESHOLD_BYTES:
+            return orjson.loads(f.read())
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+            return orjson.loads(view)
+
+def _remove_quietly(file_path):
+    """Delete a file if it exists"""
+    try:
+        os.unlink(file_path)
+    except FileNotFoundError:
+        pass
+
+def write_json_atomic(data, file_path):
+    """
+    Write JSON data to a file atomically.
+    
+    The data is written to a temporary file next to the target and then moved
+    into place, so a crash mid-write never leaves a truncated file behind.
+    Output is compact unless DEVATLAS_PRETTY_JSON is set.
+    """
+    tmp_path = f"{file_path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=JSON_DUMP_OPTIONS))
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        # Don't leave a partial temporary file behind (e.g. after a serialization error)
+        _remove_quietly(tmp_path)
+        raise
+
+def write_json_collections_atomic(collections, file_path):
+    """
+    Write (name, value) pairs as a JSON object to a file atomically.
+    
+    The object is written incrementally, one list item at a time, so only one
+    collection has to be in memory at a time. With DEVATLAS_PRETTY_JSON set,
+    each collection and list item goes on its own line; otherwise the output
+    is compact.
+    """
+    if PRETTY_JSON:
+        name_sep, item_sep, list_end, object_end = b",\n  ", b",\n    ", b"\n  ]", b"\n}\n"
+        key_sep = b": "
+    else:
+        name_sep, item_sep, list_end, object_end = b",", b",", b"]", b"}"
+        key_sep = b":"
+    first_name, first_item = name_sep.lstrip(b","), item_sep.lstrip(b",")
+    
+    tmp_path = f"{file_path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(b"{")
+            for index, (name, value) in enumerate(collections):
+                f.write(name_sep if index else first_name)
+                f.write(orjson.dumps(name) + key_sep)
+                if not isinstance(value, list) or not value:
+                    f.write(orjson.dumps(value))
+                    continue
+                
+                f.write(b"[")
+                for item_index, item in enumerate(value):
+                    f.write(item_sep if item_index else first_item)
+                    f.write(orjson.dumps(item))
+                f.write(list_end)
+            f.write(object_end)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        # Don't leave a partial temporary file behind (e.g. after a serialization error)
+        _remove_quietly(tmp_path)
+        raise
+
+def backup_file(file_path, backup_path):
+    """
+    Keep the current version of a file at backup_path.
+    
+    Uses a hard link, which copies nothing: the file is later replaced with
+    os.replace, so the link keeps pointing at the original contents. Falls
+    back to copying where hard links aren't supported (e.g. across devices).
     """
-    # Define file paths - adjusting to be more flexible with relative paths
-    mock_file_path = os.path.join(os.path.dirname(__file__), 'mock.json')
-    slack_entities_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'slack_entities.json')
+    try:
+        os.remove(backup_path)
+    except FileNotFoundError:
+        pass
+    
+    try:
+        os.link(file_path, backup_path)
+    except OSError:
+        shutil.copyfile(file_path, backup_path)
+
+def iter_updated_collections(mock_file_path, replacements, defaults=None):
+    """
+    Stream the top-level collections of the mock file with some of them replaced.
+    
+    Collections are parsed one at a time. Replacements not in the file and
+    defaults for collections the file lacks are added at the end.
     
-    # Also check alternative locations
-    if not os.path.exists(slack_entities_path):
-        alt_paths = [
+    Args:
+        mock_file_path: Path of mock.json
+        replacements: Dict of collection name -> new value
+        defaults: Dict of collection name -> value used only if the collection is missing
+    """
+    seen = set()
+    with open(mock_file_path, 'rb') as f:
+        for name, value in ijson.kvitems(f, '', use_float=True):
+            seen.add(name)
+            yield name, replacements[name] if name in replacements else value
+    
+    for name, value in {**(defaults or {}), **replacements}.items():
+        if name not in seen:
+            yield name, value
+
+# Collections of an empty mock file
+EMPTY_MOCK_DATA = {"users":[],"repositories":[],"pullRequests":[],"issues":[],"slackChannels":[],"slackMessages":[],"textChunks":[]}
+
+# Mock collections replaced by each update, mapped to (source collection, description)
+SLACK_FIELD_MAP = {
+    'slackChannels': ('channels', 'channels'),
+    'slackMessages': ('messages', 'messages')
+}
+GITHUB_FIELD_MAP = {
+    'users': ('users', 'users'),
+    'repositories': ('repositories', 'repositories'),
+    'pullRequests': ('pullRequests', 'pull requests'),
+    'issues': ('issues', 'issues')
+}
+
+# Location of mock.json
+MOCK_FILE_PATH = os.path.join(os.path.dirname(__file__), 'mock.json')
+
+# Candidate locations of each source file, in order of preference. Relative
+# candidates are made absolute (and duplicates dropped) once at import.
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CANDIDATES = {
+    key: tuple(dict.fromkeys(os.path.abspath(path) for path in paths))
+    for key, paths in {
+        'slack_entities': (
+            os.path.join(_BACKEND_DIR, 'data', 'slack_entities.json'),
             'data/slack_entities.json',
             '../data/slack_entities.json',
             'backend/data/slack_entities.json'
-        ]
-        for alt_path in alt_paths:
-            if os.path.exists(alt_path):
-                slack_entities_path = alt_path
-                break
+        ),
+        'collective': (
+            os.path.join(_BACKEND_DIR, 'collective.json'),
+            'collective.json',
+            '../collective.json',
+            'backend/collective.json',
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'collective.json')
+        )
+    }.items()
+}
+
+# Source file found for each candidate key, so the search runs once per process
+_RESOLVED = {}
+
+def _find(key):
+    """
+    Return the first candidate path of a source file that exists, remembering it.
     
-    # Check if files exist
-    if not os.path.exists(mock_file_path):
-        print(f"Error: {mock_file_path} not found")
-        
-        # Create empty mock file if it doesn't exist
-        print(f"Creating empty mock file at {mock_file_path}")
-        empty_data = {"users":[],"repositories":[],"pullRequests":[],"issues":[],"slackChannels":[],"slackMessages":[],"textChunks":[]}
-        with open(mock_file_path, 'w') as f:
-            json.dump(empty_data, f, indent=2)
-        return True
-        
-    if not os.path.exists(slack_entities_path):
-        print(f"Error: {slack_entities_path} not found")
-        return False
+    Misses aren't remembered, since the source files may be created later.
+    
+    Returns:
+        The path, or None if no candidate exists
+    """
+    path = _RESOLVED.get(key)
+    if path is not None:
+        return path
+    
+    candidates = _CANDIDATES[key]
+    for index, candidate in enumerate(candidates):
+        if os.path.isfile(candidate):
+            if index:
+                print(f"Found {os.path.basename(candidate)} at alternative path: {candidate}")
+            _RESOLVED[key] = candidate
+            return candidate
+    return None
+
+# Suffix of the sidecar recording what was last imported into the mock file
+LAST_IMPORT_SUFFIX = '.lastimport'
+
+def _file_digest(file_path):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _mock_stamp(mock_file_path):
+    """Return the (mtime, size) of the mock file, which changes whenever it is rewritten"""
+    stat = os.stat(mock_file_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _load_import_record(mock_file_path):
+    """
+    Return the record of source digests imported into the current mock file.
     
+    The record is only valid while the mock file is the one this module last
+    wrote; if anything else has replaced it since, an empty record is returned.
+    """
     try:
-        # Load the existing mock data
-        with open(mock_file_path, 'r') as f:
-            mock_data = json.load(f)
+        record = load_json(f"{mock_file_path}{LAST_IMPORT_SUFFIX}")
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return {}
+    
+    if record.get('mock') != _mock_stamp(mock_file_path):
+        return {}
+    return record
+
+def _save_import_record(mock_file_path, record):
+    """Save the import record, stamped with the mock file as just written"""
+    record['mock'] = _mock_stamp(mock_file_path)
+    write_json_atomic(record, f"{mock_file_path}{LAST_IMPORT_SUFFIX}")
+
+def _create_empty_mock(mock_file_path):
+    print(f"Error: {mock_file_path} not found")
+    
+    # Create empty mock file if it doesn't exist
+    print(f"Creating empty mock file at {mock_file_path}")
+    write_json_atomic(EMPTY_MOCK_DATA, mock_file_path)
+
+def _update_mock_section(mock_file_path, source_path, field_map, backup_suffix, source_name):
+    """
+    Replace some collections of the mock file with those of a source file.
+    
+    Args:
+        mock_file_path: Path of mock.json
+        source_path: Path of the JSON file holding the new data
+        field_map: Dict of mock collection -> (source collection, description)
+        backup_suffix: Suffix of the backup copy of the original mock file
+        source_name: Name of the data source, used in messages
+        
+    Returns:
+        True if the mock file was updated, False on error
+    """
+    try:
+        # Skip the rewrite entirely if this exact source was already imported
+        source_key = source_name.lower()
+        source_digest = _file_digest(source_path)
+        import_record = _load_import_record(mock_file_path)
+        if import_record.get(source_key) == source_digest:
+            print(f"{source_name} data in {source_path} unchanged since last import, skipping")
+            return True
         
-        # Load the slack entities data
-        with open(slack_entities_path, 'r') as f:
-            slack_data = json.load(f)
+        # Load the source data; the mock data is streamed while it's rewritten
+        source_data = load_json(source_path)
         
-        # Replace only the Slack-related parts of the mock data
-        mock_data['slackChannels'] = slack_data.get('channels', [])
-        mock_data['slackMessages'] = slack_data.get('messages', [])
+        # Replace only the collections of this source in the mock data
+        replacements = {
+            mock_field: source_data.get(source_field, [])
+            for mock_field, (source_field, _) in field_map.items()
+        }
         
-        # Create a backup of the original mock file
-        backup_path = f"{mock_file_path}.bak"
-        with open(backup_path, 'w') as f:
-            json.dump(mock_data, f, indent=2)
+        # Create a backup of the original mock file before it is replaced
+        backup_path = f"{mock_file_path}{backup_suffix}"
+        backup_file(mock_file_path, backup_path)
         print(f"Created backup of original mock file at {backup_path}")
         
         # Write the updated mock data back to the file
-        with open(mock_file_path, 'w') as f:
-            json.dump(mock_data, f, indent=2)
+        write_json_collections_atomic(iter_updated_collections(mock_file_path, replacements), mock_file_path)
+        import_record[source_key] = source_digest
+        _save_import_record(mock_file_path, import_record)
         
-        print(f"Successfully updated {mock_file_path} with Slack data from {slack_entities_path}")
-        print(f"- Added {len(mock_data['slackChannels'])} channels")
-        print(f"- Added {len(mock_data['slackMessages'])} messages")
+        print(f"Successfully updated {mock_file_path} with {source_name} data from {source_path}")
+        for mock_field, (_, description) in field_map.items():
+            print(f"- Added {len(replacements[mock_field])} {description}")
         return True
         
     except Exception as e:
-        print(f"Error updating mock data: {str(e)}")
+        print(f"Error updating mock data with {source_name} data: {str(e)}")
+        return False
+
+def update_mock_with_slack_data():
+    """
+    Updates the mock.json file by replacing only the Slack data
+    (slackChannels and slackMessages) with data from slack_entities.json
+    while preserving all GitHub-related data.
+    """
+    # Resolve file paths, also checking alternative locations
+    mock_file_path = MOCK_FILE_PATH
+    slack_entities_path = _find('slack_entities')
+    
+    # Check if files exist
+    if not os.path.isfile(mock_file_path):
+        _create_empty_mock(mock_file_path)
+        return True
+        
+    if slack_entities_path is None:
+        print(f"Error: {_CANDIDATES['slack_entities'][0]} not found")
         return False
+    
+    return _update_mock_section(mock_file_path, slack_entities_path, SLACK_FIELD_MAP, ".bak", "Slack")
 
 def update_mock_with_github_data():
     """
@@ -77,95 +319,31 @@ def update_mock_with_github_data():
     (users, repositories, pullRequests, issues) with data from collective.json
     while preserving all Slack-related data.
     """
-    # Define file paths with more flexible path resolution
-    mock_file_path = os.path.join(os.path.dirname(__file__), 'mock.json')
-    collective_file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'collective.json')
-    
-    # Check alternative locations for collective.json
-    if not os.path.exists(collective_file_path):
-        alt_paths = [
-            'collective.json',
-            '../collective.json',
-            'backend/collective.json',
-            os.path.join(os.path.dirname(__file__), 'collective.json')
-        ]
-        for alt_path in alt_paths:
-            if os.path.exists(alt_path):
-                collective_file_path = alt_path
-                print(f"Found collective.json at alternative path: {alt_path}")
-                break
+    # Resolve file paths, also checking alternative locations for collective.json
+    mock_file_path = MOCK_FILE_PATH
+    collective_file_path = _find('collective')
     
     # Check if files exist
-    if not os.path.exists(mock_file_path):
-        print(f"Error: {mock_file_path} not found")
-        
-        # Create empty mock file if it doesn't exist
-        print(f"Creating empty mock file at {mock_file_path}")
-        empty_data = {"users":[],"repositories":[],"pullRequests":[],"issues":[],"slackChannels":[],"slackMessages":[],"textChunks":[]}
-        with open(mock_file_path, 'w') as f:
-            json.dump(empty_data, f, indent=2)
+    if not os.path.isfile(mock_file_path):
+        _create_empty_mock(mock_file_path)
         return True
         
-    if not os.path.exists(collective_file_path):
-        print(f"Error: {collective_file_path} not found")
+    if collective_file_path is None:
+        print(f"Error: {_CANDIDATES['collective'][0]} not found")
         print("Creating minimal GitHub data since no collective.json found")
         
-        # Create a minimal GitHub data structure to avoid breaking the flow
-        with open(mock_file_path, 'r') as f:
-            mock_data = json.load(f)
-        
-        # Preserve existing GitHub data if available, otherwise use empty lists
-        if 'users' not in mock_data:
-            mock_data['users'] = []
-        if 'repositories' not in mock_data:
-            mock_data['repositories'] = []
-        if 'pullRequests' not in mock_data:
-            mock_data['pullRequests'] = []
-        if 'issues' not in mock_data:
-            mock_data['issues'] = []
-        
-        # Save the file with at least the structure in place
-        with open(mock_file_path, 'w') as f:
-            json.dump(mock_data, f, indent=2)
+        # Create a minimal GitHub data structure to avoid breaking the flow:
+        # preserve existing GitHub data if available, otherwise use empty lists,
+        # and save the file with at least the structure in place
+        defaults = {mock_field: [] for mock_field in GITHUB_FIELD_MAP}
+        import_record = _load_import_record(mock_file_path)
+        write_json_collections_atomic(iter_updated_collections(mock_file_path, {}, defaults), mock_file_path)
+        _save_import_record(mock_file_path, import_record)
         
         print(f"Updated {mock_file_path} with minimal GitHub data structure")
         return True
     
-    try:
-        # Load the existing mock data
-        with open(mock_file_path, 'r') as f:
-            mock_data = json.load(f)
-        
-        # Load the collective GitHub data
-        with open(collective_file_path, 'r') as f:
-            github_data = json.load(f)
-        
-        # Replace only the GitHub-related parts of the mock data
-        mock_data['users'] = github_data.get('users', [])
-        mock_data['repositories'] = github_data.get('repositories', [])
-        mock_data['pullRequests'] = github_data.get('pullRequests', [])
-        mock_data['issues'] = github_data.get('issues', [])
-        
-        # Create a backup of the original mock file
-        backup_path = f"{mock_file_path}.github.bak"
-        with open(backup_path, 'w') as f:
-            json.dump(mock_data, f, indent=2)
-        print(f"Created backup of original mock file at {backup_path}")
-        
-        # Write the updated mock data back to the file
-        with open(mock_file_path, 'w') as f:
-            json.dump(mock_data, f, indent=2)
-        
-        print(f"Successfully updated {mock_file_path} with GitHub data from {collective_file_path}")
-        print(f"- Added {len(mock_data['users'])} users")
-        print(f"- Added {len(mock_data['repositories'])} repositories")
-        print(f"- Added {len(mock_data['pullRequests'])} pull requests")
-        print(f"- Added {len(mock_data['issues'])} issues")
-        return True
-        
-    except Exception as e:
-        print(f"Error updating mock data with GitHub data: {str(e)}")
-        return False
+    return _update_mock_section(mock_file_path, collective_file_path, GITHUB_FIELD_MAP, ".github.bak", "GitHub")
 
 if __name__ == "__main__":
     # Check if there's a command line argument
@@ -7,36 +7,58 @@ Transforms the existing JSON structure into Channel and Message entities format.
 """
 
 import os
-import json
-import uuid
-from datetime import datetime
-from typing import Dict, List, Any
+import numpy as np
+import orjson
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional
 
 # JSON storage location
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 SLACK_MESSAGES_FILE = os.path.join(DATA_DIR, "slack_messages.json")
 REFORMATTED_FILE = os.path.join(DATA_DIR, "slack_entities.json")
 
+# Unix timestamps of the first and last instants a datetime can hold
+MIN_UNIX_SECONDS = datetime.min.replace(tzinfo=timezone.utc).timestamp()
+MAX_UNIX_SECONDS = datetime.max.replace(tzinfo=timezone.utc).timestamp()
+
 def load_current_data():
     """Load the current JSON data file"""
     try:
-        with open(SLACK_MESSAGES_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError) as e:
+        with open(SLACK_MESSAGES_FILE, 'rb') as f:
+            return orjson.loads(f.read())
+    except (orjson.JSONDecodeError, FileNotFoundError) as e:
         print(f"Error loading messages from file: {str(e)}")
         return None
 
 def save_reformatted_data(data):
     """Save the reformatted data to a new JSON file"""
     try:
-        with open(REFORMATTED_FILE, 'w') as f:
-            json.dump(data, indent=2, fp=f)
+        with open(REFORMATTED_FILE, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         print(f"Saved reformatted data to {REFORMATTED_FILE}")
         return True
     except Exception as e:
         print(f"Error saving reformatted data: {str(e)}")
         return False
 
+def bulk_uuid4(count: int) -> List[str]:
+    """
+    Generate many random (version 4) UUID strings at once.
+    
+    Reads the random bytes for all of them with a single os.urandom call and
+    formats them directly, instead of building one uuid.UUID per ID.
+    """
+    raw = bytearray(os.urandom(16 * count))
+    # Set the version (4) and variant (RFC 4122) bits of every UUID
+    raw[6::16] = bytes(b & 0x0F | 0x40 for b in raw[6::16])
+    raw[8::16] = bytes(b & 0x3F | 0x80 for b in raw[8::16])
+    
+    hex_digits = raw.hex()
+    return [
+        f"{hex_digits[i:i + 8]}-{hex_digits[i + 8:i + 12]}-{hex_digits[i + 12:i + 16]}-{hex_digits[i + 16:i + 20]}-{hex_digits[i + 20:i + 32]}"
+        for i in range(0, len(hex_digits), 32)
+    ]
+
 def convert_slack_ts_to_iso(slack_ts):
     """
     Convert Slack timestamp format to ISO 8601 format.
@@ -45,7 +67,7 @@ def convert_slack_ts_to_iso(slack_ts):
         slack_ts: Slack timestamp (e.g., "1745704536.966429")
         
     Returns:
-        ISO 8601 formatted timestamp (e.g., "2025-04-26T15:22:16.966Z")
+        ISO 8601 formatted timestamp (e.g., "2025-04-26T21:55:36.966Z")
     """
     if not slack_ts:
         return None
@@ -53,12 +75,84 @@ def convert_slack_ts_to_iso(slack_ts):
     try:
         # Slack timestamps are Unix timestamps with milliseconds
         unix_ts = float(slack_ts)
-        dt = datetime.fromtimestamp(unix_ts)
+        dt = datetime.fromtimestamp(unix_ts, tz=timezone.utc)
         # Format as ISO 8601 with Z for UTC
         return dt.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
-    except (ValueError, TypeError):
+    except (ValueError, TypeError, OverflowError, OSError):
         return None
 
+def convert_slack_ts_to_iso_batch(slack_ts_values: List[Any]) -> List[Optional[str]]:
+    """
+    Convert many Slack timestamps to ISO 8601 format at once.
+    
+    The date formatting runs in numpy for the whole list instead of once per
+    value. For Slack's usual 6-decimal timestamps the result is the UTC time
+    truncated to milliseconds, as datetime.fromtimestamp would give; inputs
+    with more digits can come out a millisecond off because of float
+    rounding. Values numpy can't format (empty, invalid, non-finite or
+    outside the years 1 to 9999) go through convert_slack_ts_to_iso instead,
+    which returns None for the ones that really can't be converted.
+    
+    Args:
+        slack_ts_values: Slack timestamps (e.g., "1745704536.966429")
+        
+    Returns:
+        ISO 8601 formatted timestamps (e.g., "2025-04-26T21:55:36.966Z") in the same order
+    """
+    seconds = np.full(len(slack_ts_values), np.nan)
+    for i, slack_ts in enumerate(slack_ts_values):
+        if slack_ts:
+            try:
+                seconds[i] = float(slack_ts)
+            except (ValueError, TypeError):
+                pass
+    
+    valid = np.isfinite(seconds) & (seconds >= MIN_UNIX_SECONDS) & (seconds <= MAX_UNIX_SECONDS)
+    if not valid.any():
+        return [convert_slack_ts_to_iso(slack_ts) for slack_ts in slack_ts_values]
+    
+    # Round to microseconds like datetime does, then truncate to milliseconds
+    micros = np.round(seconds[valid] * 1e6).astype(np.int64).astype("datetime64[us]")
+    formatted = iter(np.datetime_as_string(micros.astype("datetime64[ms]"), unit="ms").tolist())
+    return [next(formatted) + 'Z' if is_valid else convert_slack_ts_to_iso(slack_ts)
+            for is_valid, slack_ts in zip(valid.tolist(), slack_ts_values)]
+
+def _build_entity(message: Dict[str, Any], channel_id: str, entity_id: str,
+                  iso_thread_ts: Optional[str], iso_created_at: Optional[str]) -> Dict[str, Any]:
+    """
+    Build the message entity of a single Slack message.
+    
+    Args:
+        message: Raw message from the current data
+        channel_id: Slack ID of the channel the message belongs to
+        entity_id: UUID of the new message entity
+        iso_thread_ts: Thread timestamp in ISO 8601 format, or None if not in a thread
+        iso_created_at: Message timestamp in ISO 8601 format
+        
+    Returns:
+        The message entity
+    """
+    get = message.get
+    
+    # Get the username from user_info if available, else default to user_id
+    user_info = get("user_info")
+    user_id = get("user_id")
+    if isinstance(user_info, dict):
+        username = user_info.get("name", get("user", "unknown"))
+    elif user_id:
+        username = user_id
+    else:
+        username = get("user", "unknown")
+    
+    return {
+        "id": entity_id,
+        "slackId": username,
+        "channelId": channel_id,
+        "text": get("text", ""),
+        "threadTs": iso_thread_ts,  # Will be None if not part of a thread
+        "createdAt": iso_created_at
+    }
+
 def reformat_data(current_data):
     """
     Reformat the current data structure into the new entity format
@@ -86,21 +180,26 @@ def reformat_data(current_data):
             ...
         ]
     }
+    
+    Returns:
+        Tuple of (new data, number of messages that are part of a thread)
     """
     # Initialize new data structure
     new_data = {
         "channels": [],
         "messages": []
     }
+    thread_count = 0
     
-    # Track thread messages for additional processing
-    threads_to_process = {}  # {channel_id: {thread_ts: parent_message}}
+    # Generate the IDs of all channels and messages up front
+    entity_count = sum(1 + len(channel_data["messages"]) for channel_data in current_data["channels"].values())
+    entity_ids = iter(bulk_uuid4(entity_count))
     
     # Process each channel
     for channel_id, channel_data in current_data["channels"].items():
         # Create channel entity
         channel_entity = {
-            "id": str(uuid.uuid4()),
+            "id": next(entity_ids),
             "slackId": channel_id,
             "name": channel_data["name"],
             "isPrivate": False  # Default value, could be updated if needed
@@ -109,49 +208,19 @@ def reformat_data(current_data):
         # Add to channels list
         new_data["channels"].append(channel_entity)
         
-        # First pass: identify threads and create parent messages
-        for message in channel_data["messages"]:
-            # Track thread parent messages
-            if message.get("thread_ts") == message.get("ts") and message.get("reply_count", 0) > 0:
-                # This is a parent message of a thread
-                if channel_id not in threads_to_process:
-                    threads_to_process[channel_id] = {}
-                threads_to_process[channel_id][message.get("ts")] = message
+        # Convert the timestamps of the whole channel in one batch
+        messages = channel_data["messages"]
+        iso_thread_ts_values = convert_slack_ts_to_iso_batch([message.get("thread_ts") for message in messages])
+        iso_created_at_values = convert_slack_ts_to_iso_batch([message.get("ts", "") for message in messages])
+        thread_count += len(iso_thread_ts_values) - iso_thread_ts_values.count(None)
         
-        # Process each message in this channel
-        for message in channel_data["messages"]:
-            # Skip system messages if desired (uncomment if needed)
-            # if message.get("subtype") in ["channel_join", "channel_leave"]:
-            #     continue
-            
-            # Get the username from user_info if available, else default to user_id
-            username = message.get("user", "unknown")
-            if isinstance(message.get("user_info"), dict):
-                username = message["user_info"].get("name", username)
-            elif message.get("user_id"):
-                username = message.get("user_id")
-            
-            # Determine if this is a thread reply
-            thread_ts = message.get("thread_ts")
-            
-            # Convert thread_ts and ts to ISO format
-            iso_thread_ts = convert_slack_ts_to_iso(thread_ts) if thread_ts else None
-            iso_created_at = convert_slack_ts_to_iso(message.get("ts", ""))
-            
-            # Create message entity
-            message_entity = {
-                "id": str(uuid.uuid4()),
-                "slackId": username,
-                "channelId": channel_id,
-                "text": message.get("text", ""),
-                "threadTs": iso_thread_ts,  # Will be None if not part of a thread
-                "createdAt": iso_created_at
-            }
-            
-            # Add to messages list
-            new_data["messages"].append(message_entity)
-    
-    return new_data
+        # Build all message entities of this channel at once
+        new_data["messages"].extend([
+            _build_entity(message, channel_id, next(entity_ids), iso_thread_ts, iso_created_at)
+            for message, iso_thread_ts, iso_created_at in zip(messages, iso_thread_ts_values, iso_created_at_values)
+        ])
+    
+    return new_data, thread_count
 
 def main():
     # Load current data
@@ -162,14 +231,13 @@ def main():
     
     # Reformat the data
     print(f"Reformatting data from {len(current_data['channels'])} channels...")
-    new_data = reformat_data(current_data)
+    new_data, thread_count = reformat_data(current_data)
     
     # Print stats
-    thread_messages = [m for m in new_data["messages"] if m["threadTs"] is not None]
     print(f"Converted to new format:")
     print(f"  - {len(new_data['channels'])} channels")
     print(f"  - {len(new_data['messages'])} messages")
-    print(f"  - {len(thread_messages)} thread messages")
+    print(f"  - {thread_count} thread messages")
     
     # Save reformatted data
     if save_reformatted_data(new_data):
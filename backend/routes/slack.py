@@ -1,38 +1,68 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Header
 from typing import List, Dict, Optional
 from backend.services.slack_service import SlackService
+from backend.services.webhook_signature import HmacSha256, decode_signature, read_webhook_body, run_for_body
+from backend.config import settings
 from pydantic import BaseModel
-import json
+from urllib.parse import parse_qsl
+import orjson
 import hmac
-import hashlib
+import logging
 
 router = APIRouter()
 slack_service = SlackService()
+logger = logging.getLogger(__name__)
+
+# HMAC state for the Slack signing secret, keyed once at import
+_SLACK_SIGNER = HmacSha256(settings.SLACK_SIGNING_SECRET.encode())
 
 class ChannelTrackRequest(BaseModel):
     channel_id: str
 
-async def verify_slack_signature(request: Request, x_slack_signature: Optional[str] = Header(None), x_slack_request_timestamp: Optional[str] = Header(None)):
-    """Verify that the webhook request came from Slack using the signing secret."""
+def check_slack_signature(payload_body: bytes, x_slack_signature: Optional[str], x_slack_request_timestamp: Optional[str]):
+    """Check the Slack signature of a raw request body, raising a 401 if it doesn't match."""
     if not x_slack_signature or not x_slack_request_timestamp:
         raise HTTPException(status_code=401, detail="Missing Slack signature headers")
     
-    # Get raw request body
-    payload_body = await request.body()
-    
-    # Get Slack signing secret from config
-    from backend.config import settings
-    signing_secret = settings.SLACK_SIGNING_SECRET.encode()
-    
-    # Create the signature base string
-    sig_basestring = f"v0:{x_slack_request_timestamp}:".encode() + payload_body
+    # Decode the header once and compare raw digests rather than hex strings
+    expected = decode_signature(x_slack_signature, 'v0')
+    if expected is None:
+        raise HTTPException(status_code=401, detail="Invalid Slack signature")
     
-    # Create our own signature
-    signature = 'v0=' + hmac.new(signing_secret, sig_basestring, hashlib.sha256).hexdigest()
+    # Create our own signature over the base string "v0:<timestamp>:<body>"
+    signature = _SLACK_SIGNER.digest(f"v0:{x_slack_request_timestamp}:".encode(), payload_body)
     
     # Compare signatures
-    if not hmac.compare_digest(signature, x_slack_signature):
+    if not hmac.compare_digest(signature, expected):
         raise HTTPException(status_code=401, detail="Invalid Slack signature")
+
+def parse_slack_payload(payload_body: bytes) -> Dict:
+    """Parse a Slack request body, which is either JSON or URL-encoded form data."""
+    try:
+        return orjson.loads(payload_body)
+    except orjson.JSONDecodeError:
+        # Handle URL-encoded form data
+        body_str = payload_body.decode('utf-8')
+        try:
+            payload = dict(parse_qsl(body_str))
+            if 'payload' in payload:
+                payload = orjson.loads(payload['payload'])
+            return payload
+        except Exception as e:
+            logger.error(f"Error parsing form data: {str(e)}")
+            raise HTTPException(status_code=400, detail="Invalid payload format")
+
+def verify_and_parse_slack_payload(payload_body: bytes, x_slack_signature: Optional[str], x_slack_request_timestamp: Optional[str]) -> Dict:
+    """Check the Slack signature of a raw request body, then parse it."""
+    check_slack_signature(payload_body, x_slack_signature, x_slack_request_timestamp)
+    return parse_slack_payload(payload_body)
+
+async def verify_slack_signature(request: Request, x_slack_signature: Optional[str] = Header(None), x_slack_request_timestamp: Optional[str] = Header(None)):
+    """Verify that the webhook request came from Slack using the signing secret."""
+    # Get raw request body, rejecting oversized payloads
+    payload_body = await read_webhook_body(request)
+    
+    check_slack_signature(payload_body, x_slack_signature, x_slack_request_timestamp)
     
     return payload_body
 
@@ -40,45 +70,42 @@ async def verify_slack_signature(request: Request, x_slack_signature: Optional[s
 async def slack_webhook(request: Request):
     """Endpoint to receive Slack events."""
     
-    print("\n============ SLACK EVENT RECEIVED ============")
+    # Read the raw body once (capped in size); it is verified and parsed from these bytes
+    payload_body = await read_webhook_body(request)
     
-    # First, let's get the raw body
-    payload_body = await request.body()
-    
-    # Parse JSON payload
-    try:
-        payload = json.loads(payload_body)
-        print("Received payload:", payload)
+    # Handle Slack URL verification directly - before signature verification.
+    # The challenge payload is tiny, so only its head needs checking.
+    if b'"url_verification"' in payload_body[:256]:
+        try:
+            payload = orjson.loads(payload_body)
+        except orjson.JSONDecodeError:
+            payload = None
         
-        # Handle Slack URL verification directly - before signature verification
-        if payload.get('type') == 'url_verification':
+        if isinstance(payload, dict) and payload.get('type') == 'url_verification':
             challenge = payload.get('challenge')
-            print(f"URL Verification challenge received: {challenge}")
+            logger.debug("URL verification challenge received: %s", challenge)
             return {"challenge": challenge}
-        
-        # For non-verification requests, verify signature
-        await verify_slack_signature(request)
-        
-    except json.JSONDecodeError:
-        # Handle URL-encoded form data
-        body_str = payload_body.decode('utf-8')
-        try:
-            payload = {item.split('=')[0]: item.split('=')[1] for item in body_str.split('&')}
-            if 'payload' in payload:
-                import urllib.parse
-                payload = json.loads(urllib.parse.unquote(payload['payload']))
-        except Exception as e:
-            print(f"Error parsing form data: {str(e)}")
-            raise HTTPException(status_code=400, detail="Invalid payload format")
+    
+    # For non-verification requests, verify signature before parsing anything.
+    # Large bodies are verified and parsed in a worker thread.
+    payload = await run_for_body(
+        payload_body,
+        verify_and_parse_slack_payload,
+        payload_body,
+        request.headers.get('x-slack-signature'),
+        request.headers.get('x-slack-request-timestamp')
+    )
+    
+    # Stringifying the whole payload is expensive, so only do it when DEBUG is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Received Slack payload: %s", payload)
     
     # Get the event type
     event_type = payload.get('event', {}).get('type')
     if not event_type:
-        print("No event type found in payload")
+        logger.debug("No event type found in payload")
         return {"status": "ignored", "message": "No event type found"}
     
-    print(f"Event Type: {event_type}")
-    
     # Handle message events
     if event_type == 'message':
         event = payload.get('event', {})
@@ -87,19 +114,16 @@ async def slack_webhook(request: Request):
         text = event.get('text')
         ts = event.get('ts')
         
-        print(f"Channel: {channel}")
-        print(f"User: {user}")
-        print(f"Message: {text}")
-        print(f"Timestamp: {ts}")
+        logger.debug("Slack message event: channel=%s user=%s ts=%s text=%r", channel, user, ts, text)
         
         # Process the message
         await slack_service.process_message_event(event)
         
-        print("✅ Message event successfully processed")
+        logger.debug("Message event processed for channel %s", channel)
         return {"status": "success", "message": "Message event processed"}
     
     # Return a 200 response for any other events we're not handling yet
-    print(f"⚠️ Ignoring event type: {event_type}")
+    logger.debug("Ignoring Slack event type: %s", event_type)
     return {"status": "ignored", "message": f"Event {event_type} ignored"}
 
 @router.post("/track")
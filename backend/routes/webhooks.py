@@ -1,84 +1,101 @@
 # backend/routes/webhooks.py
-from fastapi import APIRouter, Request, Response, Header, HTTPException, Depends
+from fastapi import APIRouter, BackgroundTasks, Request, Response, Header, HTTPException, Depends
 import hmac
-import hashlib
-import json
-import os
+import orjson
 from typing import Optional
 from backend.services.github_processor import GitHubProcessor
+from backend.services.webhook_signature import HmacSha256, decode_signature, read_webhook_body, run_for_body
 from backend.config import settings
 # from uagents import Context
 
 router = APIRouter()
 
+# HMAC state for the GitHub webhook secret, keyed once at import
+_GITHUB_SIGNER = HmacSha256(settings.GITHUB_WEBHOOK_SECRET.encode())
+
 import logging
 logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 @router.post("/github-debug")
 async def github_webhook_debug(request: Request):
     """Debug endpoint to log all webhook details without verification."""
-    print("\n============ WEBHOOK DEBUG RECEIVED ============")
+    body = await request.body()
+    
+    # Everything below only formats output, so skip it entirely unless DEBUG is on
+    if not logger.isEnabledFor(logging.DEBUG):
+        return {"status": "debug", "message": "Webhook details logged"}
+    
+    logger.debug("============ WEBHOOK DEBUG RECEIVED ============")
     
     # Log all headers
-    print("=== HEADERS ===")
-    for name, value in request.headers.items():
-        print(f"{name}: {value}")
+    logger.debug("=== HEADERS ===\n%s", "\n".join(f"{name}: {value}" for name, value in request.headers.items()))
     
     # Log the raw body
-    body = await request.body()
-    print("\n=== RAW BODY ===")
-    print(body)
+    logger.debug("=== RAW BODY ===\n%r", body)
     
     # Try to parse as JSON
     try:
-        payload = json.loads(body)
-        print("\n=== JSON PAYLOAD ===")
-        print(json.dumps(payload, indent=2))
-    except:
-        print("Not a valid JSON payload")
+        payload = orjson.loads(body)
+        logger.debug("=== JSON PAYLOAD ===\n%s", orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode())
+    except ValueError:
+        logger.debug("Not a valid JSON payload")
     
     return {"status": "debug", "message": "Webhook details logged"}
 
-async def verify_github_signature(request: Request, x_hub_signature_256: Optional[str] = Header(None)):
-    """Verify that the webhook request came from GitHub using the webhook secret."""
-    if not x_hub_signature_256:
-        raise HTTPException(status_code=401, detail="Missing signature header")
-    
-    # Get raw request body
-    payload_body = await request.body()
-    
+def verify_and_parse_github_payload(payload_body: bytes, expected: bytes):
+    """Check a GitHub request body against its decoded signature, then parse it."""
     # Create our own signature
-    secret = os.environ.get("GITHUB_WEBHOOK_SECRET", "").encode()
-    signature = 'sha256=' + hmac.new(secret, payload_body, hashlib.sha256).hexdigest()
+    signature = _GITHUB_SIGNER.digest(payload_body)
     
     # Compare signatures
-    if not hmac.compare_digest(signature, x_hub_signature_256):
+    if not hmac.compare_digest(signature, expected):
         raise HTTPException(status_code=401, detail="Invalid signature")
     
-    return payload_body
+    return orjson.loads(payload_body)
 
-@router.post("/github")
-async def github_webhook(request: Request, payload_body: bytes = Depends(verify_github_signature)):
-    """Endpoint to receive GitHub webhook events."""
+async def verify_github_signature(request: Request, x_hub_signature_256: Optional[str] = Header(None)):
+    """
+    Verify that the webhook request came from GitHub using the webhook secret.
     
-    # Get the event type from headers
-    github_event = request.headers.get("X-GitHub-Event")
+    Returns the parsed payload. Large bodies are verified and parsed in a
+    worker thread so they don't block the event loop.
+    """
+    if not x_hub_signature_256:
+        raise HTTPException(status_code=401, detail="Missing signature header")
+    
+    # Decode the header once and compare raw digests rather than hex strings
+    expected = decode_signature(x_hub_signature_256, 'sha256')
+    if expected is None:
+        raise HTTPException(status_code=401, detail="Invalid signature")
     
-    # Parse JSON payload
-    payload = json.loads(payload_body)
+    # Get raw request body, rejecting oversized payloads
+    payload_body = await read_webhook_body(request)
     
+    return await run_for_body(payload_body, verify_and_parse_github_payload, payload_body, expected)
+
+def process_github_event(github_event: str, payload: dict):
+    """Process a verified GitHub webhook event (run after the response is sent)."""
     # Process with the GitHub processor - using original for compatibility
     processed_entities = GitHubProcessor.process_webhook(github_event, payload)
-    entities_count = len(processed_entities)
+    logger.info(f"{github_event} event processed, {len(processed_entities)} entities updated")
+
+@router.post("/github")
+async def github_webhook(request: Request, background_tasks: BackgroundTasks, payload: dict = Depends(verify_github_signature)):
+    """
+    Endpoint to receive GitHub webhook events.
+    
+    The event is processed in the background so GitHub gets its response
+    right away instead of waiting on collective.json to be rewritten.
+    """
     
+    # Get the event type from headers
+    github_event = request.headers.get("X-GitHub-Event")
     
-    # Return success with entity count
+    background_tasks.add_task(process_github_event, github_event, payload)
+    
+    # Return success once the event is queued
     return {
-        "status": "success", 
-        "message": f"{github_event} event processed",
-        "entities_processed": entities_count
+        "status": "accepted", 
+        "message": f"{github_event} event queued for processing"
     }
-
-
-
-
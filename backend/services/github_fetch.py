@@ -1,9 +1,162 @@
+import asyncio
+import functools
+import httpx
+import ijson
+import operator
 import requests
-import json
+import orjson
 import os
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import Callable, Iterator, List, Dict, Any, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# GitHub GraphQL endpoint
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+# Page of pull requests with only the fields of the schema, newest first like the REST listing
+PULL_REQUESTS_QUERY = """
+query($owner: String!, $repo: String!, $cursor: String) {
+  repository(owner: $owner, name: $repo) {
+    pullRequests(first: 100, after: $cursor, orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        databaseId number title body state createdAt
+        author { ... on User { databaseId } ... on Bot { databaseId } }
+      }
+    }
+  }
+}
+"""
+
+# Suffix of the page cache file kept next to an output file
+PAGE_CACHE_SUFFIX = ".etags"
+
+# Seconds to wait for a GitHub API response before giving up
+GITHUB_REQUEST_TIMEOUT = 30
+
+# Pages of a listing fetched at once (matches the session's connection pool)
+PAGE_FETCH_WORKERS = 8
+
+# Requests AsyncGitHubFetcher keeps in flight at once, low enough to stay
+# clear of GitHub's secondary rate limits
+ASYNC_REQUEST_CONCURRENCY = 10
+
+# Connection pool of AsyncGitHubFetcher's client
+ASYNC_CLIENT_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=20)
+
+# Fields of a pull request read when formatting it, fetched in one C-level call.
+# The API always includes these keys (nullable ones are null, never missing).
+_PR_FIELDS = operator.itemgetter("id", "number", "title", "body", "state", "created_at", "user")
+
+# Times a request is retried on server errors and rate limiting
+GITHUB_MAX_RETRIES = 8
+
+# Longest wait between retries, in seconds
+GITHUB_MAX_BACKOFF = 60
+
+# Remaining core requests below which listing loops wait for the window to reset
+RATE_LIMIT_LOW_WATER = 5
+
+# Server errors are retried with exponential backoff by the connection adapter;
+# rate limiting (403/429) is handled in GitHubFetcher._request
+SERVER_ERROR_RETRY = Retry(
+    total=GITHUB_MAX_RETRIES,
+    backoff_factor=1.0,
+    status_forcelist=(500, 502, 503, 504),
+    allowed_methods=frozenset({"GET", "POST"}),  # POST is only used for read-only GraphQL queries
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+
+def _rate_limit_delay(response: requests.Response, attempt: int) -> Optional[float]:
+    """
+    Work out how long to wait before retrying a rate-limited response.
+    
+    Args:
+        response: Response to a GitHub API request
+        attempt: Number of retries already made for the request
+        
+    Returns:
+        Seconds to wait, or None if the response isn't rate limited
+    """
+    if response.status_code not in (403, 429):
+        return None
+    
+    # Secondary rate limits say exactly how long to wait
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None:
+        return min(float(retry_after), GITHUB_MAX_BACKOFF)
+    
+    # Primary rate limit exhausted: wait for the window to reset
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        reset_time = int(response.headers.get("X-RateLimit-Reset", 0))
+        return min(max(0, reset_time - time.time()) + 1, GITHUB_MAX_BACKOFF)
+    
+    # A plain 403 is a permissions error, not worth retrying
+    if response.status_code == 403:
+        return None
+    
+    # Otherwise back off exponentially, with jitter so clients don't retry in lockstep
+    return min(GITHUB_MAX_BACKOFF, 2 ** attempt) + random.uniform(0, 1)
+
+def _low_quota_delay(response) -> Optional[float]:
+    """
+    Work out how long to wait for the rate limit window to reset if the core
+    quota is nearly used up.
+    
+    Only the remaining count is parsed on every page; the reset time is read
+    just when a wait is needed. Quotas of other resources (search, graphql)
+    are left alone.
+    
+    Args:
+        response: Response to a GitHub REST API request
+        
+    Returns:
+        Seconds to wait (at most a minute), or None if there is quota left
+    """
+    headers = response.headers
+    if headers.get("X-RateLimit-Resource", "core") != "core":
+        return None
+    if int(headers.get("X-RateLimit-Remaining", RATE_LIMIT_LOW_WATER)) >= RATE_LIMIT_LOW_WATER:
+        return None
+    
+    reset_time = int(headers.get("X-RateLimit-Reset", 0))
+    return min(max(0, reset_time - time.time()) + 1, GITHUB_MAX_BACKOFF)
+
+def _respect_rate_limit(response: requests.Response):
+    """Sleep until the rate limit window resets if the core quota is nearly used up"""
+    delay = _low_quota_delay(response)
+    if delay is not None:
+        time.sleep(delay)
+
+def _server_error_delay(attempt: int) -> float:
+    """Seconds to wait before retry number `attempt` + 1 after a server or connection error, as SERVER_ERROR_RETRY does"""
+    return min(GITHUB_MAX_BACKOFF, SERVER_ERROR_RETRY.backoff_factor * 2 ** attempt)
+
+def _last_page_number(response) -> int:
+    """Return the page number of a listing response's `Link: rel="last"` URL, or 1 if there is none"""
+    last_url = response.links.get("last", {}).get("url")
+    return int(parse_qs(urlparse(last_url).query)["page"][0]) if last_url else 1
+
+def _run_sync(coroutine):
+    """
+    Run a coroutine to completion from synchronous code.
+    
+    Uses asyncio.run directly, or a separate thread with its own event loop
+    when called from inside a running loop (e.g. a FastAPI startup hook).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
 
 class GitHubFetcher:
     """Class to fetch and process GitHub pull request data."""
@@ -15,17 +168,97 @@ class GitHubFetcher:
         self.repo = repo
         
         self.headers = {
-            "Accept": "application/vnd.github.v3+json"
+            "Accept": "application/vnd.github.v3+json",
+            # Ask for compressed bodies explicitly; listings are mostly prose and
+            # shrink several times over. Only encodings urllib3 can always decode
+            # are offered (br needs the optional brotli package).
+            "Accept-Encoding": "gzip, deflate"
         }
         
         if self.token:
             self.headers["Authorization"] = f"token {self.token}"
+        
+        # Reuse connections to the API across pages and calls instead of
+        # opening a new TCP+TLS connection per request
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=SERVER_ERROR_RETRY))
+        
+        # Conditional-request cache of listing pages, off until enable_page_cache is called
+        self._page_cache = None
+        self._page_cache_path = None
     
     def set_repo(self, owner: str, repo: str):
         """Update repository information."""
         self.owner = owner
         self.repo = repo
     
+    def enable_page_cache(self, cache_path: str):
+        """
+        Cache listing pages in a JSON file, keyed by their ETags.
+        
+        Args:
+            cache_path: Path of the cache file (created on first save)
+        """
+        self._page_cache_path = cache_path
+        try:
+            with open(cache_path, 'rb') as f:
+                self._page_cache = orjson.loads(f.read())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            self._page_cache = {}
+    
+    def _save_page_cache(self):
+        """Write the page cache back to its file atomically"""
+        tmp_path = f"{self._page_cache_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(self._page_cache))
+        os.replace(tmp_path, self._page_cache_path)
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request to the GitHub API, waiting out rate limits.
+        
+        403/429 responses caused by rate limiting are retried after the time
+        given by Retry-After or X-RateLimit-Reset, or with jittered
+        exponential backoff if neither is present.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed on to requests (params, json, stream, headers, ...)
+            
+        Returns:
+            The last response received
+        """
+        for attempt in range(GITHUB_MAX_RETRIES + 1):
+            response = self.session.request(method, url, timeout=GITHUB_REQUEST_TIMEOUT, **kwargs)
+            
+            delay = _rate_limit_delay(response, attempt)
+            if delay is None or attempt == GITHUB_MAX_RETRIES:
+                return response
+            
+            # Release the connection of the rejected response before retrying
+            response.close()
+            print(f"GitHub API rate limited ({response.status_code}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+        return response
+    
+    def _get(self, url: str, params: Optional[Dict[str, Any]] = None, stream: bool = False,
+             headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        Send a GET request to the GitHub API, waiting out rate limits.
+        
+        Args:
+            url: Request URL
+            params: Query parameters
+            stream: Leave the body unread so it can be streamed from response.raw
+            headers: Extra request headers
+            
+        Returns:
+            The last response received
+        """
+        return self._request("GET", url, params=params, stream=stream, headers=headers)
+    
     def fetch_pull_requests(self, limit: int = 100) -> List[Dict[str, Any]]:
         """
         Fetch pull requests and format them according to the specified schema.
@@ -42,9 +275,8 @@ class GitHubFetcher:
         remaining = limit
         
         while remaining > 0:
-            response = requests.get(
+            response = self._get(
                 f"https://api.github.com/repos/{self.owner}/{self.repo}/pulls",
-                headers=self.headers,
                 params={
                     "state": "all",  # Get open, closed, and merged PRs
                     "page": page,
@@ -55,35 +287,18 @@ class GitHubFetcher:
             if response.status_code != 200:
                 raise Exception(f"GitHub API error: {response.status_code}, {response.text}")
                 
-            prs = response.json()
+            prs = orjson.loads(response.content)
             
             if not prs:
                 break  # No more PRs to fetch
             
-            for pr in prs[:remaining]:
-                formatted_pr = {
-                    "id": str(pr.get("id", "")),
-                    "number": pr.get("number"),
-                    "title": pr.get("title", ""),
-                    "body": pr.get("body", ""),
-                    "state": pr.get("state", ""),
-                    "createdAt": pr.get("created_at", ""),
-                    "authorId": f"user-{pr.get('user', {}).get('id', '')}" if pr.get('user') else None,
-                    "repositoryId": f"repo-{self.owner}-{self.repo}"
-                }
-                
-                formatted_prs.append(formatted_pr)
+            formatted_prs.extend(map(self._format_pull_request, prs[:remaining]))
             
             remaining -= len(prs)
             page += 1
             
-            # Check rate limits
-            if "X-RateLimit-Remaining" in response.headers:
-                remaining_requests = int(response.headers["X-RateLimit-Remaining"])
-                if remaining_requests < 5:
-                    reset_time = int(response.headers["X-RateLimit-Reset"])
-                    sleep_time = max(0, reset_time - time.time()) + 1
-                    time.sleep(min(sleep_time, 60))  # Sleep at most a minute
+            # Slow down before the rate limit runs out
+            _respect_rate_limit(response)
         
         return formatted_prs
     
@@ -100,87 +315,215 @@ class GitHubFetcher:
         if not self.owner or not self.repo:
             raise ValueError("Repository owner and name must be set before fetching.")
         
-        response = requests.get(
-            f"https://api.github.com/repos/{self.owner}/{self.repo}/pulls/{pr_number}",
-            headers=self.headers
+        response = self._get(
+            f"https://api.github.com/repos/{self.owner}/{self.repo}/pulls/{pr_number}"
         )
         
         if response.status_code != 200:
             raise Exception(f"GitHub API error: {response.status_code}, {response.text}")
             
-        pr = response.json()
-        
-        formatted_pr = {
-            "id": str(pr.get("id", "")),
-            "number": pr.get("number"),
-            "title": pr.get("title", ""),
-            "body": pr.get("body", ""),
-            "state": pr.get("state", ""),
-            "createdAt": pr.get("created_at", ""),
-            "authorId": f"user-{pr.get('user', {}).get('id', '')}" if pr.get('user') else None,
-            "repositoryId": f"repo-{self.owner}-{self.repo}"
-        }
-        
-        return formatted_pr
+        return self._format_pull_request(orjson.loads(response.content))
 
-    def fetch_all_pull_requests(self) -> List[Dict[str, Any]]:
+    def _get_page(self, url: str, params: Dict[str, Any], page: int, etag: Optional[str] = None) -> requests.Response:
         """
-        Fetch all pull requests for the repository with no limit.
+        Fetch one page of a paginated API endpoint.
         
+        Args:
+            url: Endpoint URL
+            params: Query parameters other than the page number
+            page: Page number, starting at 1
+            etag: ETag of the cached copy of the page, if any
+            
         Returns:
-            List of all pull requests formatted according to the schema
+            The successful response, with its body not yet read; a 304
+            response if the page still matches `etag`
         """
-        if not self.owner or not self.repo:
-            raise ValueError("Repository owner and name must be set before fetching.")
+        response = self._get(
+            url,
+            params={**params, "page": page},
+            stream=True,
+            headers={"If-None-Match": etag} if etag else None
+        )
         
-        formatted_prs = []
-        page = 1
-        per_page = 100  # Maximum allowed by GitHub API
+        if response.status_code not in (200, 304):
+            raise Exception(f"GitHub API error: {response.status_code}, {response.text}")
+        
+        # Slow down before the rate limit runs out
+        _respect_rate_limit(response)
+        
+        return response
+    
+    @staticmethod
+    def _read_page(response: requests.Response, format_item: Callable[[Dict[str, Any]], Any]) -> List[Any]:
+        """
+        Stream-parse the items of a page, keeping only their formatted versions.
+        
+        Items are parsed one at a time with ijson straight from the socket, so
+        the full page (with all the fields that get dropped) is never held in
+        memory at once.
+        """
+        # Let urllib3 undo any gzip/deflate content encoding while streaming
+        response.raw.decode_content = True
+        try:
+            return [format_item(item) for item in ijson.items(response.raw, 'item', use_float=True)]
+        finally:
+            response.close()
+    
+    def _iter_all_pages(self, url: str, params: Dict[str, Any],
+                        format_item: Callable[[Dict[str, Any]], Any]) -> Iterator[List[Any]]:
+        """
+        Fetch every page of a paginated API endpoint.
+        
+        The first page's `Link: rel="last"` header gives the number of pages,
+        so the remaining pages are then fetched concurrently rather than one
+        after another.
+        
+        With a page cache enabled, each page is requested conditionally with
+        its last ETag; unchanged pages come back as 304 Not Modified (which
+        GitHub doesn't count against the rate limit) and are served from the
+        cache.
+        
+        Args:
+            url: Endpoint URL
+            params: Query parameters other than the page number
+            format_item: Function applied to each item as it is parsed
+            
+        Yields:
+            The formatted items of each page, in page order
+        """
+        cache_key = f"{url}?{urlencode(sorted(params.items()))}"
+        cached_pages = self._page_cache.get(cache_key, {}) if self._page_cache is not None else {}
+        fetched_pages = {}
+        
+        def fetch_page(page):
+            cached = cached_pages.get(str(page))
+            response = self._get_page(url, params, page, cached["etag"] if cached else None)
+            if response.status_code == 304:
+                response.close()
+                fetched_pages[str(page)] = cached
+                return cached["items"], response
+            
+            items = self._read_page(response, format_item)
+            etag = response.headers.get("ETag")
+            if etag:
+                fetched_pages[str(page)] = {"etag": etag, "items": items}
+            return items, response
+        
+        first_page, first_response = fetch_page(1)
+        if first_response.status_code == 304:
+            last_page = cached_pages.get("last_page", 1)
+        else:
+            last_page = _last_page_number(first_response) if first_page else 1
+        yield first_page
+        
+        if last_page > 1:
+            with ThreadPoolExecutor(max_workers=PAGE_FETCH_WORKERS) as executor:
+                for items, _ in executor.map(fetch_page, range(2, last_page + 1)):
+                    yield items
+        
+        # Only a complete listing replaces the cached one
+        if self._page_cache is not None:
+            self._page_cache[cache_key] = {"last_page": last_page, **fetched_pages}
+            self._save_page_cache()
+    
+    def _format_pull_request(self, pr: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a pull request from the API according to the schema"""
+        pr_id, number, title, body, state, created_at, user = _PR_FIELDS(pr)
+        return {
+            "id": str(pr_id),
+            "number": number,
+            "title": title,
+            "body": body,
+            "state": state,
+            "createdAt": created_at,
+            "authorId": f"user-{user.get('id', '')}" if user else None,
+            "repositoryId": f"repo-{self.owner}-{self.repo}"
+        }
+
+    def _format_pull_request_node(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a pull request node from the GraphQL API like a REST one"""
+        author = node.get("author") or {}
+        return {
+            "id": str(node["databaseId"]),
+            "number": node["number"],
+            "title": node["title"],
+            "body": node["body"],
+            # REST reports merged pull requests as closed
+            "state": "open" if node["state"] == "OPEN" else "closed",
+            "createdAt": node["createdAt"],
+            "authorId": f"user-{author['databaseId']}" if author.get("databaseId") is not None else None,
+            "repositoryId": f"repo-{self.owner}-{self.repo}"
+        }
+    
+    def _iter_pull_requests_graphql(self) -> Iterator[Dict[str, Any]]:
+        """
+        Fetch all pull requests with the GraphQL API, 100 per query.
         
+        Each query asks for only the fields of the schema, so responses are a
+        fraction of the size of the REST listing.
+        
+        Yields:
+            Each pull request formatted according to the schema
+        """
+        cursor = None
         while True:
-            response = requests.get(
-                f"https://api.github.com/repos/{self.owner}/{self.repo}/pulls",
-                headers=self.headers,
-                params={
-                    "state": "all",  # Get open, closed, and merged PRs
-                    "page": page,
-                    "per_page": per_page
-                }
-            )
+            response = self._request("POST", GITHUB_GRAPHQL_URL, json={
+                "query": PULL_REQUESTS_QUERY,
+                "variables": {"owner": self.owner, "repo": self.repo, "cursor": cursor}
+            })
             
             if response.status_code != 200:
                 raise Exception(f"GitHub API error: {response.status_code}, {response.text}")
-                
-            prs = response.json()
-            
-            if not prs:
-                break  # No more PRs to fetch
             
-            for pr in prs:
-                formatted_pr = {
-                    "id": str(pr.get("id", "")),
-                    "number": pr.get("number"),
-                    "title": pr.get("title", ""),
-                    "body": pr.get("body", ""),
-                    "state": pr.get("state", ""),
-                    "createdAt": pr.get("created_at", ""),
-                    "authorId": f"user-{pr.get('user', {}).get('id', '')}" if pr.get('user') else None,
-                    "repositoryId": f"repo-{self.owner}-{self.repo}"
-                }
-                
-                formatted_prs.append(formatted_pr)
+            result = orjson.loads(response.content)
+            if result.get("errors"):
+                raise Exception(f"GitHub GraphQL error: {result['errors']}")
             
-            page += 1
+            pull_requests = result["data"]["repository"]["pullRequests"]
+            for node in pull_requests["nodes"]:
+                yield self._format_pull_request_node(node)
             
-            # Check rate limits
-            if "X-RateLimit-Remaining" in response.headers:
-                remaining_requests = int(response.headers["X-RateLimit-Remaining"])
-                if remaining_requests < 5:
-                    reset_time = int(response.headers["X-RateLimit-Reset"])
-                    sleep_time = max(0, reset_time - time.time()) + 1
-                    time.sleep(min(sleep_time, 60))  # Sleep at most a minute
+            if not pull_requests["pageInfo"]["hasNextPage"]:
+                break
+            cursor = pull_requests["pageInfo"]["endCursor"]
+
+    def iter_all_pull_requests(self) -> Iterator[Dict[str, Any]]:
+        """
+        Fetch all pull requests for the repository with no limit, one at a time.
         
-        return formatted_prs
+        Yields:
+            Each pull request formatted according to the schema
+        """
+        if not self.owner or not self.repo:
+            raise ValueError("Repository owner and name must be set before fetching.")
+        
+        # GraphQL returns just the fields we keep, so it is used whenever there
+        # is a token (which it requires). Without one, REST pages are listed
+        # and revalidated with ETags if a page cache is enabled.
+        if self.token:
+            yield from self._iter_pull_requests_graphql()
+            return
+        
+        pages = self._iter_all_pages(
+            f"https://api.github.com/repos/{self.owner}/{self.repo}/pulls",
+            {
+                "state": "all",  # Get open, closed, and merged PRs
+                "per_page": 100  # Maximum allowed by GitHub API
+            },
+            self._format_pull_request
+        )
+        
+        for prs in pages:
+            yield from prs
+
+    def fetch_all_pull_requests(self) -> List[Dict[str, Any]]:
+        """
+        Fetch all pull requests for the repository with no limit.
+        
+        Returns:
+            List of all pull requests formatted according to the schema
+        """
+        return list(self.iter_all_pull_requests())
 
     def fetch_issues(self, limit: int = 100) -> List[Dict[str, Any]]:
         """
@@ -198,9 +541,8 @@ class GitHubFetcher:
         remaining = limit
         
         while remaining > 0:
-            response = requests.get(
+            response = self._get(
                 f"https://api.github.com/repos/{self.owner}/{self.repo}/issues",
-                headers=self.headers,
                 params={
                     "state": "all",  # Get open, closed, and merged issues
                     "page": page,
@@ -211,42 +553,36 @@ class GitHubFetcher:
             if response.status_code != 200:
                 raise Exception(f"GitHub API error: {response.status_code}, {response.text}")
                 
-            issues = response.json()
+            issues = orjson.loads(response.content)
             
             if not issues:
                 break  # No more issues to fetch
             
-            for issue in issues[:remaining]:
-                # Skip pull requests which also appear in the issues endpoint
-                if "pull_request" in issue:
-                    continue
-                    
-                formatted_issue = {
-                    "id": f"issue-{issue.get('id', '')}",
-                    "number": issue.get("number"),
-                    "title": issue.get("title", ""),
-                    "body": issue.get("body", ""),
-                    "state": issue.get("state", ""),
-                    "createdAt": issue.get("created_at", ""),
-                    "authorId": f"user-{issue.get('user', {}).get('id', '')}" if issue.get('user') else None,
-                    "repositoryId": f"repo-{self.owner}-{self.repo}"
-                }
-                
-                formatted_issues.append(formatted_issue)
+            # Skip pull requests which also appear in the issues endpoint
+            formatted_issues.extend([self._format_issue(issue) for issue in issues[:remaining]
+                                     if "pull_request" not in issue])
             
             remaining -= len(issues)
             page += 1
             
-            # Check rate limits
-            if "X-RateLimit-Remaining" in response.headers:
-                remaining_requests = int(response.headers["X-RateLimit-Remaining"])
-                if remaining_requests < 5:
-                    reset_time = int(response.headers["X-RateLimit-Reset"])
-                    sleep_time = max(0, reset_time - time.time()) + 1
-                    time.sleep(min(sleep_time, 60))  # Sleep at most a minute
+            # Slow down before the rate limit runs out
+            _respect_rate_limit(response)
         
         return formatted_issues
     
+    def _format_issue(self, issue: Dict[str, Any]) -> Dict[str, Any]:
+        """Format an issue from the API according to the schema"""
+        return {
+            "id": f"issue-{issue.get('id', '')}",
+            "number": issue.get("number"),
+            "title": issue.get("title", ""),
+            "body": issue.get("body", ""),
+            "state": issue.get("state", ""),
+            "createdAt": issue.get("created_at", ""),
+            "authorId": f"user-{issue.get('user', {}).get('id', '')}" if issue.get('user') else None,
+            "repositoryId": f"repo-{self.owner}-{self.repo}"
+        }
+    
     def fetch_all_issues(self) -> List[Dict[str, Any]]:
         """
         Fetch all issues for the repository with no limit.
@@ -262,9 +598,8 @@ class GitHubFetcher:
         per_page = 100  # Maximum allowed by GitHub API
         
         while True:
-            response = requests.get(
+            response = self._get(
                 f"https://api.github.com/repos/{self.owner}/{self.repo}/issues",
-                headers=self.headers,
                 params={
                     "state": "all",  # Get open, closed, and merged issues
                     "page": page,
@@ -275,38 +610,19 @@ class GitHubFetcher:
             if response.status_code != 200:
                 raise Exception(f"GitHub API error: {response.status_code}, {response.text}")
                 
-            issues = response.json()
+            issues = orjson.loads(response.content)
             
             if not issues:
                 break  # No more issues to fetch
             
-            for issue in issues:
-                # Skip pull requests which also appear in the issues endpoint
-                if "pull_request" in issue:
-                    continue
-                    
-                formatted_issue = {
-                    "id": f"issue-{issue.get('id', '')}",
-                    "number": issue.get("number"),
-                    "title": issue.get("title", ""),
-                    "body": issue.get("body", ""),
-                    "state": issue.get("state", ""),
-                    "createdAt": issue.get("created_at", ""),
-                    "authorId": f"user-{issue.get('user', {}).get('id', '')}" if issue.get('user') else None,
-                    "repositoryId": f"repo-{self.owner}-{self.repo}"
-                }
-                
-                formatted_issues.append(formatted_issue)
+            # Skip pull requests which also appear in the issues endpoint
+            formatted_issues.extend([self._format_issue(issue) for issue in issues
+                                     if "pull_request" not in issue])
             
             page += 1
             
-            # Check rate limits
-            if "X-RateLimit-Remaining" in response.headers:
-                remaining_requests = int(response.headers["X-RateLimit-Remaining"])
-                if remaining_requests < 5:
-                    reset_time = int(response.headers["X-RateLimit-Reset"])
-                    sleep_time = max(0, reset_time - time.time()) + 1
-                    time.sleep(min(sleep_time, 60))  # Sleep at most a minute
+            # Slow down before the rate limit runs out
+            _respect_rate_limit(response)
         
         return formatted_issues
 
@@ -320,15 +636,14 @@ class GitHubFetcher:
         if not self.owner or not self.repo:
             raise ValueError("Repository owner and name must be set before fetching.")
             
-        response = requests.get(
-            f"https://api.github.com/repos/{self.owner}/{self.repo}",
-            headers=self.headers
+        response = self._get(
+            f"https://api.github.com/repos/{self.owner}/{self.repo}"
         )
         
         if response.status_code != 200:
             raise Exception(f"GitHub API error: {response.status_code}, {response.text}")
             
-        repo_data = response.json()
+        repo_data = orjson.loads(response.content)
         
         formatted_repo = {
             "id": f"repo-{repo_data.get('id', '')}",
@@ -355,9 +670,8 @@ class GitHubFetcher:
         remaining = limit
         
         while remaining > 0:
-            response = requests.get(
+            response = self._get(
                 f"https://api.github.com/repos/{self.owner}/{self.repo}/contributors",
-                headers=self.headers,
                 params={
                     "page": page,
                     "per_page": per_page
@@ -370,42 +684,40 @@ class GitHubFetcher:
                     break
                 raise Exception(f"GitHub API error: {response.status_code}, {response.text}")
                 
-            contributors = response.json()
+            contributors = orjson.loads(response.content)
             
             if not contributors:
                 break
                 
             for contrib in contributors[:remaining]:
                 # Get detailed user information
-                user_response = requests.get(
-                    contrib.get("url", ""),
-                    headers=self.headers
+                user_response = self._get(
+                    contrib.get("url", "")
                 )
                 
                 if user_response.status_code == 200:
-                    user_data = user_response.json()
-                    formatted_contributor = {
-                        "id": f"user-{contrib.get('id', '')}",
-                        "githubLogin": contrib.get("login", ""),
-                        "name": user_data.get("name", ""),
-                        "email": user_data.get("email", "")
-                    }
-                    
-                    formatted_contributors.append(formatted_contributor)
+                    formatted_contributors.append(
+                        self._format_contributor(contrib, orjson.loads(user_response.content))
+                    )
                 
             remaining -= len(contributors)
             page += 1
             
-            # Handle rate limiting
-            if "X-RateLimit-Remaining" in response.headers:
-                remaining_requests = int(response.headers["X-RateLimit-Remaining"])
-                if remaining_requests < 5:
-                    reset_time = int(response.headers["X-RateLimit-Reset"])
-                    sleep_time = max(0, reset_time - time.time()) + 1
-                    time.sleep(min(sleep_time, 60))
+            # Slow down before the rate limit runs out
+            _respect_rate_limit(response)
         
         return formatted_contributors
     
+    @staticmethod
+    def _format_contributor(contrib: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a contributor and their user details according to the schema"""
+        return {
+            "id": f"user-{contrib.get('id', '')}",
+            "githubLogin": contrib.get("login", ""),
+            "name": user_data.get("name", ""),
+            "email": user_data.get("email", "")
+        }
+    
     def fetch_all_contributors(self) -> List[Dict[str, Any]]:
         """
         Fetch all contributors for the repository with no limit.
@@ -421,9 +733,8 @@ class GitHubFetcher:
         per_page = 100
         
         while True:
-            response = requests.get(
+            response = self._get(
                 f"https://api.github.com/repos/{self.owner}/{self.repo}/contributors",
-                headers=self.headers,
                 params={
                     "page": page,
                     "per_page": per_page
@@ -436,40 +747,262 @@ class GitHubFetcher:
                     break
                 raise Exception(f"GitHub API error: {response.status_code}, {response.text}")
                 
-            contributors = response.json()
+            contributors = orjson.loads(response.content)
             
             if not contributors:
                 break
                 
             for contrib in contributors:
                 # Get detailed user information
-                user_response = requests.get(
-                    contrib.get("url", ""),
-                    headers=self.headers
+                user_response = self._get(
+                    contrib.get("url", "")
                 )
                 
                 if user_response.status_code == 200:
-                    user_data = user_response.json()
-                    formatted_contributor = {
-                        "id": f"user-{contrib.get('id', '')}",
-                        "githubLogin": contrib.get("login", ""),
-                        "name": user_data.get("name", ""),
-                        "email": user_data.get("email", "")
-                    }
-                    
-                    formatted_contributors.append(formatted_contributor)
+                    formatted_contributors.append(
+                        self._format_contributor(contrib, orjson.loads(user_response.content))
+                    )
                 
             page += 1
             
-            # Handle rate limiting
-            if "X-RateLimit-Remaining" in response.headers:
-                remaining_requests = int(response.headers["X-RateLimit-Remaining"])
-                if remaining_requests < 5:
-                    reset_time = int(response.headers["X-RateLimit-Reset"])
-                    sleep_time = max(0, reset_time - time.time()) + 1
-                    time.sleep(min(sleep_time, 60))
+            # Slow down before the rate limit runs out
+            _respect_rate_limit(response)
+        
+        return formatted_contributors
+
+class AsyncGitHubFetcher(GitHubFetcher):
+    """
+    GitHubFetcher whose fan-out listings (all issues, all contributors) run
+    concurrently on an httpx.AsyncClient.
+    
+    Once the first page says how many pages there are, the rest are fetched
+    together, and each contributor's user details are fetched concurrently
+    instead of one round trip at a time. At most ASYNC_REQUEST_CONCURRENCY
+    requests are in flight. The synchronous methods keep their signatures and
+    wrap the async ones, so this is a drop-in replacement for GitHubFetcher.
+    """
+    
+    def _client(self) -> httpx.AsyncClient:
+        """Create a client for one batch of requests (clients are bound to an event loop)"""
+        return httpx.AsyncClient(headers=self.headers, timeout=GITHUB_REQUEST_TIMEOUT, limits=ASYNC_CLIENT_LIMITS)
+    
+    async def _aget(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, url: str,
+                    params: Optional[Dict[str, Any]] = None,
+                    headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """
+        Send a GET request to the GitHub API, retrying server errors and
+        waiting out rate limits.
+        
+        Server errors and connection failures are retried with the same
+        exponential backoff SERVER_ERROR_RETRY gives the requests session;
+        rate-limited responses are retried as in GitHubFetcher._request.
+        
+        Args:
+            client: Client to send the request with
+            semaphore: Bounds the requests in flight
+            url: Request URL
+            params: Query parameters
+            headers: Extra request headers
+            
+        Returns:
+            The last response received
+        """
+        for attempt in range(GITHUB_MAX_RETRIES + 1):
+            try:
+                async with semaphore:
+                    response = await client.get(url, params=params, headers=headers)
+            except httpx.TransportError as e:
+                if attempt == GITHUB_MAX_RETRIES:
+                    raise
+                delay = _server_error_delay(attempt)
+                print(f"GitHub API request failed ({e!r}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            
+            if response.status_code in SERVER_ERROR_RETRY.status_forcelist:
+                delay = _server_error_delay(attempt)
+                reason = "server error"
+            else:
+                delay = _rate_limit_delay(response, attempt)
+                reason = "rate limited"
+            if delay is None or attempt == GITHUB_MAX_RETRIES:
+                return response
+            
+            print(f"GitHub API {reason} ({response.status_code}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        return response
+    
+    async def _aget_all_pages(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, url: str,
+                              params: Dict[str, Any],
+                              format_item: Callable[[Dict[str, Any]], Any]) -> Optional[List[Any]]:
+        """
+        Fetch every page of a paginated API endpoint, pages 2..N concurrently.
+        
+        With a page cache enabled, pages are requested conditionally with
+        their last ETags and unchanged ones are served from the cache, as in
+        GitHubFetcher._iter_all_pages.
+        
+        Args:
+            client: Client to send the requests with
+            semaphore: Bounds the requests in flight
+            url: Endpoint URL
+            params: Query parameters other than the page number
+            format_item: Function applied to each item; items it maps to None are dropped
+            
+        Returns:
+            The formatted items of all pages in page order, or None if the endpoint returned 404
+        """
+        cache_key = f"{url}?{urlencode(sorted(params.items()))}"
+        cached_pages = self._page_cache.get(cache_key, {}) if self._page_cache is not None else {}
+        fetched_pages = {}
+        
+        async def fetch_page(page):
+            cached = cached_pages.get(str(page))
+            response = await self._aget(client, semaphore, url, {**params, "page": page},
+                                        {"If-None-Match": cached["etag"]} if cached else None)
+            if response.status_code == 304:
+                fetched_pages[str(page)] = cached
+                items = cached["items"]
+            elif response.status_code == 200:
+                items = [item for item in map(format_item, orjson.loads(response.content)) if item is not None]
+                etag = response.headers.get("ETag")
+                if etag:
+                    fetched_pages[str(page)] = {"etag": etag, "items": items}
+            else:
+                return None, response
+            
+            # Slow down before the rate limit runs out
+            delay = _low_quota_delay(response)
+            if delay is not None:
+                await asyncio.sleep(delay)
+            return items, response
+        
+        items, first_response = await fetch_page(1)
+        if first_response.status_code == 404:
+            return None
+        if items is None:
+            raise Exception(f"GitHub API error: {first_response.status_code}, {first_response.text}")
+        
+        if first_response.status_code == 304:
+            last_page = cached_pages.get("last_page", 1)
+        else:
+            last_page = _last_page_number(first_response)
+        
+        items = list(items)
+        for page_items, response in await asyncio.gather(*(fetch_page(page) for page in range(2, last_page + 1))):
+            if page_items is None:
+                raise Exception(f"GitHub API error: {response.status_code}, {response.text}")
+            items.extend(page_items)
+        
+        # Only a complete listing replaces the cached one
+        if self._page_cache is not None:
+            self._page_cache[cache_key] = {"last_page": last_page, **fetched_pages}
+            self._save_page_cache()
+        return items
+    
+    async def fetch_all_issues_async(self) -> List[Dict[str, Any]]:
+        """
+        Fetch all issues for the repository with no limit.
+        
+        Returns:
+            List of all issues formatted according to the schema
+        """
+        if not self.owner or not self.repo:
+            raise ValueError("Repository owner and name must be set before fetching.")
+        
+        semaphore = asyncio.Semaphore(ASYNC_REQUEST_CONCURRENCY)
+        async with self._client() as client:
+            issues = await self._aget_all_pages(
+                client, semaphore,
+                f"https://api.github.com/repos/{self.owner}/{self.repo}/issues",
+                {"state": "all", "per_page": 100},
+                # Skip pull requests which also appear in the issues endpoint
+                lambda issue: None if "pull_request" in issue else self._format_issue(issue)
+            )
+        
+        if issues is None:
+            raise Exception(f"GitHub API error: 404, repository {self.owner}/{self.repo} not found")
+        return issues
+    
+    async def fetch_all_contributors_async(self) -> List[Dict[str, Any]]:
+        """
+        Fetch all contributors for the repository with no limit.
+        
+        Returns:
+            List of all contributors in the required format
+        """
+        if not self.owner or not self.repo:
+            raise ValueError("Repository owner and name must be set before fetching.")
+        
+        semaphore = asyncio.Semaphore(ASYNC_REQUEST_CONCURRENCY)
+        async with self._client() as client:
+            contributors = await self._aget_all_pages(
+                client, semaphore,
+                f"https://api.github.com/repos/{self.owner}/{self.repo}/contributors",
+                {"per_page": 100},
+                # Keep only what the user lookups and formatting need
+                lambda contrib: {"id": contrib.get("id", ""), "login": contrib.get("login", ""),
+                                 "url": contrib.get("url", "")}
+            )
+            if contributors is None:
+                print(f"No contributors found for {self.owner}/{self.repo}")
+                return []
+            
+            # Get detailed user information for every contributor at once
+            user_responses = await asyncio.gather(
+                *(self._aget(client, semaphore, contrib.get("url", "")) for contrib in contributors)
+            )
         
+        formatted_contributors = []
+        for contrib, user_response in zip(contributors, user_responses):
+            if user_response.status_code == 200:
+                formatted_contributors.append(
+                    self._format_contributor(contrib, orjson.loads(user_response.content))
+                )
+            elif user_response.status_code in SERVER_ERROR_RETRY.status_forcelist:
+                # Still failing after the retries; don't return a silently incomplete list
+                raise Exception(f"GitHub API error: {user_response.status_code}, {user_response.text}")
+            else:
+                print(f"Skipping contributor {contrib['login']}: user lookup returned {user_response.status_code}")
         return formatted_contributors
+    
+    def fetch_all_issues(self) -> List[Dict[str, Any]]:
+        """Fetch all issues for the repository (see fetch_all_issues_async)"""
+        return _run_sync(self.fetch_all_issues_async())
+    
+    def fetch_all_contributors(self) -> List[Dict[str, Any]]:
+        """Fetch all contributors for the repository (see fetch_all_contributors_async)"""
+        return _run_sync(self.fetch_all_contributors_async())
+
+@functools.lru_cache(maxsize=64)
+def _cached_fetcher(owner: str, repo: str, token: str, page_cache_path: Optional[str]) -> GitHubFetcher:
+    """Create the fetcher for one combination of repository, token and page cache file"""
+    fetcher = AsyncGitHubFetcher(token=token)
+    fetcher.set_repo(owner, repo)
+    if page_cache_path:
+        fetcher.enable_page_cache(page_cache_path)
+    return fetcher
+
+def _fetcher_for(owner: str, repo: str, output_file: Optional[str] = None) -> GitHubFetcher:
+    """
+    Return the fetcher of a repository, reusing it (and its pooled connections)
+    across calls instead of building a new session every time.
+    
+    Fetchers are keyed by the current GITHUB_TOKEN and by the page cache file,
+    so a rotated token or a different output file gets its own fetcher and a
+    cached one is never reconfigured by later callers.
+    
+    Args:
+        owner: Repository owner/organization
+        repo: Repository name
+        output_file: Output file whose page cache sidecar the fetcher should use, if any
+    """
+    page_cache_path = os.path.abspath(f"{output_file}{PAGE_CACHE_SUFFIX}") if output_file else None
+    return _cached_fetcher(owner, repo, os.environ.get("GITHUB_TOKEN", ""), page_cache_path)
+
+def invalidate_fetcher_cache():
+    """Drop the cached fetchers and their connections"""
+    _cached_fetcher.cache_clear()
 
 # Function to fetch all pull requests and save to collective.json
 def fetch_and_save_all_pull_requests(owner: str, repo: str, output_file: str = "collective.json") -> Dict[str, Any]:
@@ -482,29 +1015,35 @@ def fetch_and_save_all_pull_requests(owner: str, repo: str, output_file: str = "
         output_file: Path to save the JSON file (default: collective.json)
         
     Returns:
-        Dictionary with repository info and the list of pull requests
+        Dictionary with repository info and the number of pull requests saved
+        (the pull requests themselves are only written to the file)
     """
-    token = os.environ.get("GITHUB_TOKEN", "")
-    fetcher = GitHubFetcher(token=token)
-    fetcher.set_repo(owner, repo)
+    fetcher = _fetcher_for(owner, repo, output_file)
+    
+    # Taken once and shared by the result and error paths
+    timestamp = datetime.now().isoformat()
     
     try:
-        # Fetch all pull requests
-        pull_requests = fetcher.fetch_all_pull_requests()
-        
         # Create result object with metadata
         result = {
             "repository": f"{owner}/{repo}",
-            "timestamp": datetime.now().isoformat(),
-            "count": len(pull_requests),
-            "pull_requests": pull_requests
+            "timestamp": timestamp
         }
         
-        # Save to JSON file
-        with open(output_file, 'w') as f:
-            json.dump(result, f, indent=2)
-        
-        print(f"Saved {len(pull_requests)} pull requests to {output_file}")
+        # Save to JSON file, writing each pull request as soon as it is fetched
+        # so the full list is never held in memory
+        count = 0
+        with open(output_file, 'wb') as f:
+            f.write(b'{\n  "repository": ' + orjson.dumps(result["repository"])
+                    + b',\n  "timestamp": ' + orjson.dumps(result["timestamp"])
+                    + b',\n  "pull_requests": [')
+            for pr in fetcher.iter_all_pull_requests():
+                f.write((b",\n    " if count else b"\n    ") + orjson.dumps(pr))
+                count += 1
+            f.write((b"\n  ]" if count else b"]") + b',\n  "count": ' + str(count).encode() + b"\n}\n")
+        
+        result["count"] = count
+        print(f"Saved {count} pull requests to {output_file}")
         
         return result
     except Exception as e:
@@ -514,13 +1053,13 @@ def fetch_and_save_all_pull_requests(owner: str, repo: str, output_file: str = "
         # Save error information
         error_result = {
             "repository": f"{owner}/{repo}",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "error": error_msg,
             "pull_requests": []
         }
         
-        with open(output_file, 'w') as f:
-            json.dump(error_result, f, indent=2)
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(error_result, option=orjson.OPT_INDENT_2))
         
         return error_result
 
@@ -537,9 +1076,10 @@ def fetch_and_save_all_issues(owner: str, repo: str, output_file: str = "collect
     Returns:
         Dictionary with repository info and the list of issues
     """
-    token = os.environ.get("GITHUB_TOKEN", "")
-    fetcher = GitHubFetcher(token=token)
-    fetcher.set_repo(owner, repo)
+    fetcher = _fetcher_for(owner, repo)
+    
+    # Taken once and shared by the result and error paths
+    timestamp = datetime.now().isoformat()
     
     try:
         # Fetch all issues
@@ -548,14 +1088,14 @@ def fetch_and_save_all_issues(owner: str, repo: str, output_file: str = "collect
         # Create result object with metadata
         result = {
             "repository": f"{owner}/{repo}",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "count": len(issues),
             "issues": issues
         }
         
         # Save to JSON file
-        with open(output_file, 'w') as f:
-            json.dump(result, f, indent=2)
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
         
         print(f"Saved {len(issues)} issues to {output_file}")
         
@@ -567,13 +1107,13 @@ def fetch_and_save_all_issues(owner: str, repo: str, output_file: str = "collect
         # Save error information
         error_result = {
             "repository": f"{owner}/{repo}",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "error": error_msg,
             "issues": []
         }
         
-        with open(output_file, 'w') as f:
-            json.dump(error_result, f, indent=2)
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(error_result, option=orjson.OPT_INDENT_2))
         
         return error_result
 
@@ -591,9 +1131,10 @@ def fetch_and_save_all_pr_and_issues(owner: str, repo: str, output_file: str = "
     Returns:
         Dictionary with repository info and the combined list of PRs and issues
     """
-    token = os.environ.get("GITHUB_TOKEN", "")
-    fetcher = GitHubFetcher(token=token)
-    fetcher.set_repo(owner, repo)
+    fetcher = _fetcher_for(owner, repo, output_file)
+    
+    # Taken once and shared by the result and error paths
+    timestamp = datetime.now().isoformat()
     
     try:
         # Fetch repository info
@@ -616,10 +1157,10 @@ def fetch_and_save_all_pr_and_issues(owner: str, repo: str, output_file: str = "
         
         if os.path.exists(output_file):
             try:
-                with open(output_file, 'r') as f:
-                    existing_data = json.load(f)
+                with open(output_file, 'rb') as f:
+                    existing_data = orjson.loads(f.read())
                 print(f"Loaded existing data from {output_file}")
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 print(f"Error parsing {output_file}, creating new file")
         
         # Merge new data with existing data
@@ -650,8 +1191,8 @@ def fetch_and_save_all_pr_and_issues(owner: str, repo: str, output_file: str = "
                 existing_issue_ids.add(issue.get("id"))
         
         # Save the updated data back to the file
-        with open(output_file, 'w') as f:
-            json.dump(existing_data, f, indent=2)
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(existing_data, option=orjson.OPT_INDENT_2))
         
         print(f"Updated {output_file} with new data:")
         print(f"- Users: {len(existing_data['users'])} (added {len(contributors) - len(existing_user_ids.intersection([u.get('id') for u in contributors]))})")
@@ -662,7 +1203,7 @@ def fetch_and_save_all_pr_and_issues(owner: str, repo: str, output_file: str = "
         # Add metadata for return value
         metadata = {
             "repository": f"{owner}/{repo}",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         }
         
         return {**existing_data, **metadata}
@@ -673,7 +1214,7 @@ def fetch_and_save_all_pr_and_issues(owner: str, repo: str, output_file: str = "
         # Create error result but don't overwrite existing file
         error_result = {
             "repository": f"{owner}/{repo}",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "error": error_msg
         }
         
@@ -708,9 +1249,7 @@ def get_repository_pull_requests(owner: str, repo: str, limit: int = 100) -> Lis
     Returns:
         List of pull requests in the specified format
     """
-    token = os.environ.get("GITHUB_TOKEN", "")
-    fetcher = GitHubFetcher(token=token)
-    fetcher.set_repo(owner, repo)
+    fetcher = _fetcher_for(owner, repo)
     
     try:
         return fetcher.fetch_pull_requests(limit=limit)
@@ -730,9 +1269,7 @@ def get_pull_request(owner: str, repo: str, pr_number: int) -> Dict[str, Any]:
     Returns:
         Pull request data in the specified format
     """
-    token = os.environ.get("GITHUB_TOKEN", "")
-    fetcher = GitHubFetcher(token=token)
-    fetcher.set_repo(owner, repo)
+    fetcher = _fetcher_for(owner, repo)
     
     try:
         return fetcher.fetch_pull_request_by_number(pr_number)
@@ -752,9 +1289,7 @@ def get_repository_issues(owner: str, repo: str, limit: int = 100) -> List[Dict[
     Returns:
         List of issues in the specified format
     """
-    token = os.environ.get("GITHUB_TOKEN", "")
-    fetcher = GitHubFetcher(token=token)
-    fetcher.set_repo(owner, repo)
+    fetcher = _fetcher_for(owner, repo)
     
     try:
         return fetcher.fetch_issues(limit=limit)
@@ -1,6 +1,7 @@
-import json
+import orjson
 import os
 import logging
+import threading
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from backend.config import settings
@@ -16,6 +17,10 @@ class GitHubProcessor:
     # Path to collective.json file
     COLLECTIVE_FILE_PATH = "collective.json"
     
+    # Serializes the load-modify-save of collective.json across webhook events
+    # processed concurrently in the background
+    _collective_lock = threading.Lock()
+    
     @classmethod
     def process_webhook(cls, event_type: str, payload: Dict[Any, Any]) -> List[Dict]:
         """
@@ -28,6 +33,12 @@ class GitHubProcessor:
         Returns:
             List of entities that were added or updated
         """
+        with cls._collective_lock:
+            return cls._process_webhook(event_type, payload)
+    
+    @classmethod
+    def _process_webhook(cls, event_type: str, payload: Dict[Any, Any]) -> List[Dict]:
+        """Process a webhook event; the caller holds the collective.json lock"""
         # Load existing data or create structure if file doesn't exist
         collective_data = cls._load_collective_data()
         
@@ -59,54 +70,77 @@ class GitHubProcessor:
                     collective_data["users"].append(user_data)
                     processed_entities.append({"type": "user", "id": user_data["id"]})
         
-        # Process PR data
-        if event_type == "pull_request" and "pull_request" in payload:
-            pr_data = cls._process_pull_request(payload["pull_request"], payload["repository"])
-            if pr_data:
-                # Check if PR already exists with this author
-                author_pr_exists = False
-                for existing_pr in collective_data["pullRequests"]:
-                    if (existing_pr["number"] == pr_data["number"] and 
-                        existing_pr["repositoryId"] == pr_data["repositoryId"] and
-                        existing_pr["authorId"] == pr_data["authorId"]):
-                        author_pr_exists = True
-                        # Update existing PR
-                        existing_pr.update(pr_data)
-                        processed_entities.append({"type": "pull_request", "id": pr_data["id"]})
-                        break
-                
-                # If PR with this author doesn't exist, add it
-                if not author_pr_exists:
-                    collective_data["pullRequests"].append(pr_data)
-                    processed_entities.append({"type": "pull_request", "id": pr_data["id"]})
-        
-        # Process Issue data
-        if event_type == "issues" and "issue" in payload:
-            issue_data = cls._process_issue(payload["issue"], payload["repository"])
-            if issue_data:
-                # Check if issue already exists
-                existing_issue = next((i for i in collective_data["issues"] 
-                                     if i["id"] == issue_data["id"]), None)
-                if existing_issue:
-                    # Update existing issue
-                    existing_issue.update(issue_data)
-                    processed_entities.append({"type": "issue", "id": issue_data["id"]})
-                else:
-                    collective_data["issues"].append(issue_data)
-                    processed_entities.append({"type": "issue", "id": issue_data["id"]})
+        # Merge the event-specific entity, if this event type carries one
+        merger = cls._EVENT_MERGERS.get(event_type)
+        if merger:
+            merger(cls, collective_data, payload, processed_entities)
         
         # Save the updated collective data
         cls._save_collective_data(collective_data)
         
         return processed_entities
     
+    @classmethod
+    def _merge_pull_request(cls, collective_data: Dict[str, List[Dict]], payload: Dict[Any, Any],
+                            processed_entities: List[Dict]):
+        """Add or update the pull request of a pull_request event in collective_data"""
+        if "pull_request" not in payload:
+            return
+        
+        pr_data = cls._process_pull_request(payload["pull_request"], payload["repository"])
+        if pr_data:
+            # Check if PR already exists with this author
+            author_pr_exists = False
+            for existing_pr in collective_data["pullRequests"]:
+                if (existing_pr["number"] == pr_data["number"] and 
+                    existing_pr["repositoryId"] == pr_data["repositoryId"] and
+                    existing_pr["authorId"] == pr_data["authorId"]):
+                    author_pr_exists = True
+                    # Update existing PR
+                    existing_pr.update(pr_data)
+                    processed_entities.append({"type": "pull_request", "id": pr_data["id"]})
+                    break
+                
+            # If PR with this author doesn't exist, add it
+            if not author_pr_exists:
+                collective_data["pullRequests"].append(pr_data)
+                processed_entities.append({"type": "pull_request", "id": pr_data["id"]})
+    
+    @classmethod
+    def _merge_issue(cls, collective_data: Dict[str, List[Dict]], payload: Dict[Any, Any],
+                     processed_entities: List[Dict]):
+        """Add or update the issue of an issues event in collective_data"""
+        if "issue" not in payload:
+            return
+        
+        issue_data = cls._process_issue(payload["issue"], payload["repository"])
+        if issue_data:
+            # Check if issue already exists
+            existing_issue = next((i for i in collective_data["issues"] 
+                                 if i["id"] == issue_data["id"]), None)
+            if existing_issue:
+                # Update existing issue
+                existing_issue.update(issue_data)
+                processed_entities.append({"type": "issue", "id": issue_data["id"]})
+            else:
+                collective_data["issues"].append(issue_data)
+                processed_entities.append({"type": "issue", "id": issue_data["id"]})
+    
+    # Function merging the event-specific entity into collective.json, by event
+    # type; these are the plain functions behind the classmethods above, so
+    # they are called with the class as their first argument
+    _EVENT_MERGERS = {
+        "pull_request": _merge_pull_request.__func__,
+        "issues": _merge_issue.__func__
+    }
+    
     @classmethod
     def _load_collective_data(cls) -> Dict[str, List[Dict]]:
         """Load data from collective.json or create empty structure"""
         if os.path.exists(cls.COLLECTIVE_FILE_PATH):
             try:
-                with open(cls.COLLECTIVE_FILE_PATH, 'r') as f:
-                    data = json.load(f)
+                with open(cls.COLLECTIVE_FILE_PATH, 'rb') as f:
+                    data = orjson.loads(f.read())
                 
                 # Ensure all required sections exist
                 for section in ["users", "repositories", "pullRequests", "issues"]:
@@ -114,7 +148,7 @@ class GitHubProcessor:
                         data[section] = []
                 
                 return data
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 logger.error(f"Error parsing {cls.COLLECTIVE_FILE_PATH}, creating new file")
         
         # Return empty structure if file doesn't exist or is invalid
@@ -128,8 +162,8 @@ class GitHubProcessor:
     @classmethod
     def _save_collective_data(cls, data: Dict[str, List[Dict]]) -> None:
         """Save data to collective.json file"""
-        with open(cls.COLLECTIVE_FILE_PATH, 'w') as f:
-            json.dump(data, f, indent=2)
+        with open(cls.COLLECTIVE_FILE_PATH, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         
         logger.info(f"Updated collective.json with {len(data['users'])} users, "
                    f"{len(data['repositories'])} repositories, "
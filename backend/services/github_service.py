@@ -16,68 +16,70 @@ async def process_push_event(payload):
         # Get commit information
         commits = payload.get("commits", [])
         
-        # Print header
-        print(f"\n==== Push Event: {repo_name} - {branch} ====")
-        print(f"Pushed by: {pusher}")
-        print(f"Total Commits: {len(commits)}")
-        print("-" * 50)
+        # Log header
+        logger.debug("\n==== Push Event: %s - %s ====", repo_name, branch)
+        logger.debug("Pushed by: %s", pusher)
+        logger.debug("Total Commits: %s", len(commits))
+        logger.debug("-" * 50)
         
-        # Process and print each commit (similar to git log)
-        for commit in commits:
-            commit_id = commit["id"]
-            commit_message = commit["message"]
-            commit_timestamp = commit["timestamp"]
-            commit_url = commit["url"]
-            author = commit["author"]
+        # Log each commit (similar to git log); skipped entirely unless DEBUG is on,
+        # so production pushes don't pay for formatting every commit
+        if logger.isEnabledFor(logging.DEBUG):
+            for commit in commits:
+                commit_id = commit["id"]
+                commit_message = commit["message"]
+                commit_timestamp = commit["timestamp"]
+                commit_url = commit["url"]
+                author = commit["author"]
             
-            # Format timestamp if needed
-            try:
-                dt = datetime.fromisoformat(commit_timestamp.replace('Z', '+00:00'))
-                formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S")
-            except:
-                formatted_time = commit_timestamp
+                # Format timestamp if needed
+                try:
+                    dt = datetime.fromisoformat(commit_timestamp.replace('Z', '+00:00'))
+                    formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S")
+                except:
+                    formatted_time = commit_timestamp
             
-            # Get changed files
-            added_files = commit.get("added", [])
-            modified_files = commit.get("modified", [])
-            removed_files = commit.get("removed", [])
+                # Get changed files
+                added_files = commit.get("added", [])
+                modified_files = commit.get("modified", [])
+                removed_files = commit.get("removed", [])
             
-            # Print commit information like git log
-            print(f"commit {commit_id}")
-            print(f"Author: {author['name']} <{author['email']}>")
-            print(f"Date:   {formatted_time}")
-            print(f"URL:    {commit_url}")
-            print()
+                # Log commit information like git log
+                logger.debug("commit %s", commit_id)
+                logger.debug("Author: %s <%s>", author['name'], author['email'])
+                logger.debug("Date:   %s", formatted_time)
+                logger.debug("URL:    %s", commit_url)
+                logger.debug("")
             
-            # Fix the f-string with newline issue
-            newline = "\n"
-            indented_message = commit_message.strip().replace(newline, f"{newline}    ")
-            print(f"    {indented_message}")
-            print()
+                # Fix the f-string with newline issue
+                newline = "\n"
+                indented_message = commit_message.strip().replace(newline, f"{newline}    ")
+                logger.debug("    %s", indented_message)
+                logger.debug("")
             
-            # Print file changes summary
-            if added_files:
-                print(f"    Added ({len(added_files)}):")
-                for file in added_files[:5]:  # Limit to first 5 files to avoid clutter
-                    print(f"      + {file}")
-                if len(added_files) > 5:
-                    print(f"      + ... {len(added_files)-5} more files")
+                # Log file changes summary
+                if added_files:
+                    logger.debug("    Added (%s):", len(added_files))
+                    for file in added_files[:5]:  # Limit to first 5 files to avoid clutter
+                        logger.debug("      + %s", file)
+                    if len(added_files) > 5:
+                        logger.debug("      + ... %s more files", len(added_files)-5)
             
-            if modified_files:
-                print(f"    Modified ({len(modified_files)}):")
-                for file in modified_files[:5]:
-                    print(f"      ~ {file}")
-                if len(modified_files) > 5:
-                    print(f"      ~ ... {len(modified_files)-5} more files")
+                if modified_files:
+                    logger.debug("    Modified (%s):", len(modified_files))
+                    for file in modified_files[:5]:
+                        logger.debug("      ~ %s", file)
+                    if len(modified_files) > 5:
+                        logger.debug("      ~ ... %s more files", len(modified_files)-5)
             
-            if removed_files:
-                print(f"    Removed ({len(removed_files)}):")
-                for file in removed_files[:5]:
-                    print(f"      - {file}")
-                if len(removed_files) > 5:
-                    print(f"      - ... {len(removed_files)-5} more files")
+                if removed_files:
+                    logger.debug("    Removed (%s):", len(removed_files))
+                    for file in removed_files[:5]:
+                        logger.debug("      - %s", file)
+                    if len(removed_files) > 5:
+                        logger.debug("      - ... %s more files", len(removed_files)-5)
             
-            print("-" * 50)
+                logger.debug("-" * 50)
             
         logger.info(f"Processed push event for {repo_name}, branch {branch}, {len(commits)} commits")
         
@@ -104,54 +106,54 @@ async def process_pull_request_event(payload):
         
         is_merged = payload["pull_request"].get("merged", False)
         
-        # Print header
-        print(f"\n==== Pull Request Event: {repo_name} ====")
-        print(f"Action: {action.upper()}")
-        print(f"PR #{pr_number}: {pr_title}")
-        print(f"User: {user}")
-        print(f"URL: {pr_url}")
-        print("-" * 50)
+        # Log header
+        logger.debug("\n==== Pull Request Event: %s ====", repo_name)
+        logger.debug("Action: %s", action.upper())
+        logger.debug("PR #%s: %s", pr_number, pr_title)
+        logger.debug("User: %s", user)
+        logger.debug("URL: %s", pr_url)
+        logger.debug("-" * 50)
         
-        # Print PR details
-        print(f"Source: {head_branch} → Target: {base_branch}")
+        # Log PR details
+        logger.debug("Source: %s → Target: %s", head_branch, base_branch)
         
         # Handle different PR actions
         if action == "opened" or action == "reopened":
-            print(f"Status: {action.upper()}")
-            print(f"\nDescription:")
+            logger.debug("Status: %s", action.upper())
+            logger.debug("\nDescription:")
             
             # Format PR body with indentation
             newline = "\n"
             if pr_body:
                 indented_body = pr_body.strip().replace(newline, f"{newline}    ")
-                print(f"    {indented_body}")
+                logger.debug("    %s", indented_body)
             else:
-                print("    No description provided.")
+                logger.debug("    No description provided.")
                 
         elif action == "closed":
             if is_merged:
-                print("Status: MERGED")
+                logger.debug("Status: MERGED")
                 merged_by = payload["pull_request"]["merged_by"]["login"]
-                print(f"Merged by: {merged_by}")
+                logger.debug("Merged by: %s", merged_by)
             else:
-                print("Status: CLOSED (not merged)")
+                logger.debug("Status: CLOSED (not merged)")
                 
         elif action == "synchronize":
-            print("Status: UPDATED (new commits pushed)")
+            logger.debug("Status: UPDATED (new commits pushed)")
             
         elif action == "review_requested":
             reviewers = payload["pull_request"]["requested_reviewers"]
             reviewer_names = [reviewer["login"] for reviewer in reviewers]
-            print(f"Review requested from: {', '.join(reviewer_names)}")
+            logger.debug("Review requested from: %s", ', '.join(reviewer_names))
             
         # If the PR was merged, get the changed files
         if action == "closed" and is_merged:
             # In a real implementation, you'd need to make additional API calls
             # to get the full list of changed files in the PR
-            print("\nThis PR modified files (showing few examples):")
-            print("    * Add file list API call in production version")
+            logger.debug("\nThis PR modified files (showing few examples):")
+            logger.debug("    * Add file list API call in production version")
             
-        print("-" * 50)
+        logger.debug("-" * 50)
             
         logger.info(f"Processed pull request event for {repo_name}, PR #{pr_number}, action: {action}")
         